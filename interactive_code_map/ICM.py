@@ -1,1124 +1,4010 @@
-import pygame
-import pickle
-import os
-import math
-
-DARK_RED = (139, 0, 0)
-YELLOW = (235, 195, 65)
-BLACK = (0, 0, 0)
-ORANGE = (255, 165, 0)
-BLUE = (30, 144, 255)
-CYAN = (47, 237, 237)
-RED = (194, 57, 33)
-LIME_GREEN = (50, 205, 50)
-LIGHT_RED = (255, 0, 0)
-WHITE = (255, 255, 255)
-GREY = (125, 125, 125)
-LIGHT_PINK = (255, 182, 193)
-DARK_GREEN = (1, 100, 32)
-PURPLE = (181, 60, 177)
-BROWN = (150, 75, 0)
-DARK_GREY = (52, 52, 52)
-
-
-class Memory:
-    """
-    Class used to store data across game instances
-    """
-
-    def __init__(self, width, height):
-        self.res_width = width
-        self.res_height = height
-        self.music = None
-        self.dp = []
-        self.memory_manager = MemoryPoint()
-        self.dp = self.memory_manager.depickle_dp("save")
-        self.screen = None
-
-    def load_game(self):
-        """ Load previous game instance, usually from a text_file"""
-        pass
-
-    def load_scenes(self):
-        """ Load all scenes from a text file"""
-        pass
-
-
-class MemoryPoint:
-    """
-    Class used to manage and hold all storage actions
-    """
-    def __init__(self):
-        # Datapoints:
-        self.dp_titles = []
-        self.dp_desc = []
-        self.dp_icons = {}
-        self.dp_lines = {}
-        self.dp_line_colors = {}
-
-    def comp_dp(self, dp_list):
-        for dp in dp_list:
-            self.dp_titles += [str(dp.title.text)]
-            self.dp_desc += [dp.description]
-            self.dp_icons[dp.id] = [dp.icon.color, dp.icon.rect.x,
-                                    dp.icon.rect.y, dp.icon.width,
-                                    dp.icon.height]
-            self.dp_lines[dp.id] = [[other_dp.id]
-                                    for other_dp in dp.associated]
-            self.dp_line_colors[dp.id] = dp.line_color
-
-    def pickle_dp(self, pickle_path):
-        with open(pickle_path + "/my_map", "wb") as out_file:
-            pickle.dump(self.dp_titles, out_file)
-            pickle.dump(self.dp_desc, out_file)
-            pickle.dump(self.dp_icons, out_file)
-            pickle.dump(self.dp_lines, out_file)
-            pickle.dump(self.dp_line_colors, out_file)
-
-        out_file.close()
-
-    def depickle_dp(self, pickle_path):
-        dp_list = []
-        dp_dict = {}
-        if len(os.listdir("save")) < 1:
-            return dp_list
-
-        with open(pickle_path + "/my_map", "rb") as in_file:
-            self.dp_titles = pickle.load(in_file)
-            self.dp_desc = pickle.load(in_file)
-            self.dp_icons = pickle.load(in_file)
-            self.dp_lines = pickle.load(in_file)
-            self.dp_line_colors = pickle.load(in_file)
-
-        all_id = list(self.dp_icons.keys())
-        # Create datapoint list
-        for dp_id in all_id:
-            new_point = DataPoint()
-            # todo: add more stuff to dp and method call here respectively
-            new_point.title.text = self.dp_titles[dp_id]
-            new_point.title.font_size = 12
-            new_point.title.setup()
-            new_point.title.render()
-            new_point.change_icon_location(self.dp_icons[dp_id][1],
-                                           (self.dp_icons[dp_id][2]))
-            new_point.change_icon_color(self.dp_icons[dp_id][0])
-            new_point.change_id(dp_id)
-            new_point.description = self.dp_desc[dp_id]
-            new_point.description.split_text(new_point.sel_page)
-
-            dp_list += [new_point]
-            dp_dict[dp_id] = new_point
-        # Make lines by establishing connections in our current datapoints
-        for dp_id in all_id:
-            if 0 < len(self.dp_lines[dp_id]):
-                for line in self.dp_lines[dp_id]:
-                    dp_dict[dp_id].associated += [dp_dict[line[0]]]
-                dp_dict[dp_id].line_color = self.dp_line_colors[dp_id]
-
-        return dp_list
-
-
-class Text:
-    """
-    Class used to simplify text creation for pygame
-    """
-
-    def __init__(self, text, text_pos, font_size, font_type,
-                 font_color, text_other):
-        self.text = text  # Text as a string
-        self.position = text_pos  # Text position as a tuple or list (x and y)
-        self.font_size = int(font_size)  # Int determining how big the text is
-        self.font_type = font_type  # String used to indicate what font
-        """Font selection is determined by your computer and it's preset fonts
-        """
-        self.color = font_color
-        """A constant string for a tuple or a tuple using RGB values"""
-        self.other = text_other
-        """PLACEHOLDER for any other variables needed or desired in text"""
-        self.font = None  # Initialized here, defined in setup()
-        self.text_rect = None  # Initialized here, defined in render()
-        self.text_img = None  # Initialized here, defined in render()
-
-        self.setup()  # Called to set up the font
-        self.render()
-        """Called to continuously update the position, rect, color, and text
-        """
-
-    def setup(self):
-        """
-        Uses font type and size to translate into pygame text font
-        to make self.font
-        """
-        self.font = pygame.font.SysFont(self.font_type, self.font_size)
-
-    def render(self):
-        """
-        Creates self.text_img or the pygame image of the text using self.text,
-            self.color.
-        Creates self.text_rect, or a rect object using the size of the text.
-        Then centers the rect around the text (or the defined position)
-        """
-        self.text_img = self.font.render(self.text, True, self.color)
-        self.text_rect = self.text_img.get_rect()
-        self.text_rect.center = self.position
-
-    def scale(self, width, height):
-        self.position = list(self.position)
-        self.position[0] = int(self.position[0] * width)
-        self.position[1] = int(self.position[1] * height)
-        self.position = tuple(self.position)
-        self.font_size = int(self.font_size * max(width, height))
-
-        # Apply those changes
-        self.setup()
-        self.render()
-
-
-class Scene:
-    """
-    Class template for creating scene based games
-    """
-
-    def __init__(self):
-        """
-        self.this_scene will tell the current scene it's on at that moment.
-        Currently, it's set to itself, which means the
-        current scene is this one.
-        """
-        self.this_scene = self
-        self.run_scene = True
-        self.level_id = -1
-
-    def input(self, pressed, held):
-        # this will be overridden in subclasses
-        """
-        This function should contain the pressed for loop and other held
-        buttons. Pressing or holding these buttons should cause something
-        to change such as a class variable (+= 1, True/False, change str.. etc.)
-        or call another function.
-
-        :param pressed: Detect buttons that are pressed (like if held, it will
-        only be updated with the initial press)
-        :param held: Detect buttons that are held down
-        :return:
-        """
-        pass
-
-    def update(self):
-        # this will be overridden in subclasses
-        """
-        This function should check for variables that need to be updated
-        continuously. A good way to distinguish this from input is that this
-        update function doesn't directly respond from a button press. For
-        example, let's have input add to self.x by 1, or self.x += 1. Then, if
-        we wanted to keep self.x within the bounds of 0 to 10, we check for that
-        in update. In update, we'd use if self.x < 0 and 10 < self.x to check
-        whenever self.x goes out of these bounds to then reset self.x.
-
-        :return:
-        """
-        pass
-
-    def render(self, screen):
-        # this will be overridden in subclasses
-        """
-        This function is solely used for rendering purposes such as
-        screen.blit or pygame.draw
-        :param screen:
-        :return:
-        """
-        pass
-
-    def change_scene(self, next_scene):
-        """
-        This function is used in the main pygame loop. This function is
-        responsible for formally changing the scene
-        """
-        self.this_scene = next_scene
-
-    def close_game(self):
-        """
-        Set the current scene to nothing and is used to stop the game.
-        This function is responsible for ending the game loop (or scene)
-        formally.
-        """
-        self.change_scene(None)
-
-
-class Map(Scene):
-    def __init__(self, memory):
-        Scene.__init__(self)
-
-        self.memory = memory
-
-        self.datapoints = self.memory.dp
-        self.mouse = pygame.Rect(0, 0, 1, 1)
-        self.select_point = None
-        self.show_select = False
-        self.sort_mode = 0
-
-        self.x_offset = 0
-        self.y_offset = 0
-        self.dir_delay = pygame.time.get_ticks()
-
-        self.follow_mouse = False
-
-        self.edit_options = [pygame.Rect(1, 1, 1, 1),  # Make connections
-                             pygame.Rect(2, 2, 1, 1),  # None
-                             pygame.Rect(3, 3, 1, 1),
-                             pygame.Rect(4, 4, 1, 1)]  # None
-        self.edit_modes = [self.mode_0,
-                           self.mode_1,
-                           self.mode_2,
-                           self.mode_3,
-                           self.mode_4
-                           ]
-        self.current_mode = 0
-        """
-        Reflects the corresponding edit options in human indices
-        1: icon color
-        2: icon location
-        3: icon radius
-        
-        We reserve 0 for no options
-        """
-        self.render_modes = [self.render_mode_0,
-                             self.render_mode_0,
-                             self.render_mode_1,
-                             self.render_mode_2,
-                             self.render_mode_3]
-        # Render modes reflect self.current_mode as well
-
-        self.color_options = [DARK_RED, DARK_GREEN, DARK_GREY,
-                              RED, LIME_GREEN, GREY,
-                              BLUE, YELLOW, ORANGE,
-                              CYAN, PURPLE]
-        self.rect_colors = []
-        self.line_col_ind = 0
-        x, y = 0, 0
-        width, height = 20, 20
-        color_per_row = 3
-        color_iter = 0
-        for color in self.color_options:
-            self.rect_colors += [Rect(color, [x + (width * color_iter),
-                                              y],
-                                      width, height)]
-
-            if color_per_row - 2 < color_iter:
-                y += height
-                color_iter = 0
-            else:
-                color_iter += 1
-
-        if 0 < len(self.memory.memory_manager.dp_icons):
-            self.id_count = max(list(
-                self.memory.memory_manager.dp_icons.keys())) + 1
-        else:
-            self.id_count = 0
-
-        self.confirm_rect = pygame.Rect(self.memory.res_width - 30,
-                                        self.memory.res_height - 30,
-                                        30, 30)     # Exit description mode
-        self.desc_right = pygame.Rect(self.memory.res_width - 30,
-                                      self.memory.res_height - 90, 30, 30)      # Go right/next page
-        self.desc_left = pygame.Rect(30, self.memory.res_height - 90, 30, 30)   # Go left/previous page
-        self.text = ""
-        self.last_char = None
-        self.cap_toggle = False
-        self.held_char_timer = pygame.time.get_ticks()
-        self.initial_held = pygame.time.get_ticks()
-
-        self.confirm_delete = pygame.Rect(((self.memory.res_width * 2) // 3,
-                                          (self.memory.res_height * 2) // 3,
-                                          30, 30))      # Click to delete a point
-        self.confirm_keep = pygame.Rect((self.memory.res_width // 3,
-                                        (self.memory.res_height * 2) // 3,
-                                        30, 30))        # Click to not delete a point
-
-        self.confirm_title = pygame.Rect(self.memory.res_width / 2,
-                                         (self.memory.res_height / 2) + 60,
-                                         30, 30)
-
-        img_path = "assets/images/"
-        self.option_imgs = [None, None, None, None]
-        self.confirm_img = pygame.image.load(img_path +
-                                             "ICM_ID1_48x48_Check.png").convert_alpha()
-        self.decline_img = pygame.image.load(img_path +
-                                             "ICM_ID0_48x48_X.png").convert_alpha()
-        op_1 = pygame.image.load(img_path + "ICM_ID2_48x48_LineConnect.png").convert_alpha()
-        op_2 = pygame.image.load(img_path + "ICM_ID3_48x48_TypeDesc.png").convert_alpha()
-        self.option_imgs = [pygame.transform.scale(op_1, [20, 20]),
-                            pygame.transform.scale(op_2, [20, 20]),
-                            None,
-                            None]
-
-    def input(self, pressed, held):
-        for action in pressed:
-            if action == pygame.MOUSEMOTION:
-                self.mouse.x = pygame.mouse.get_pos()[0]
-                self.mouse.y = pygame.mouse.get_pos()[1]
-
-            if action == pygame.MOUSEBUTTONDOWN:
-                # This can be put here since only current_mode 4 is only being affected
-                if self.current_mode == 4:
-                    self.select_point.title.font_size = 30
-                    self.select_point.title.setup()
-                    self.select_point.title.render()
-
-                # Different modes when pressing left click
-                self.edit_modes[self.current_mode]()
-
-            if action == pygame.MOUSEBUTTONUP and self.follow_mouse:
-                self.follow_mouse = False
-
-            if action == pygame.K_ESCAPE:
-                self.run_scene = False
-
-            if self.current_mode == 1 or self.current_mode == 0:
-                if action == pygame.K_w:
-                    self.y_offset += 5
-                elif action == pygame.K_s:
-                    self.y_offset -= 5
-                if action == pygame.K_a:
-                    self.x_offset += 5
-                elif action == pygame.K_d:
-                    self.x_offset -= 5
-
-            if self.current_mode == 2:
-                # Typing mode
-
-                if action == pygame.K_CAPSLOCK:
-                    self.cap_toggle = not self.cap_toggle
-
-                """
-                If statement for character finds, in this order:
-                    - Lowercase
-                    - Uppercase
-                    - Numbers
-                    - Then every other crucial key like !, ?, (, ), ,, etc.
-                """
-                if 97 <= action <= 122 and self.cap_toggle:
-                    self.last_char = action - 32
-                    self.select_point.description.write_page(self.select_point.sel_page,
-                                                             action - 32)
-                    self.initial_held = pygame.time.get_ticks()
-                elif 97 <= action <= 122 or \
-                        48 <= action <= 57 or \
-                        action in [33, 44, 46, 47, 58, 63]:
-                    self.last_char = action
-                    self.select_point.description.write_page(self.select_point.sel_page,
-                                                             action)
-                    self.initial_held = pygame.time.get_ticks()
-                elif action == pygame.K_SPACE:
-                    self.last_char = -14
-                    self.select_point.description.write_page(self.select_point.sel_page,
-                                                             -14)
-                    self.initial_held = pygame.time.get_ticks()
-                elif action == pygame.K_BACKSPACE:
-                    self.last_char = 0
-                    self.select_point.description.erase_write(self.select_point.sel_page)
-                    self.initial_held = pygame.time.get_ticks()
-                else:
-                    self.last_char = None
-
-            elif self.current_mode == 4:
-                if action == pygame.K_CAPSLOCK:
-                    self.cap_toggle = not self.cap_toggle
-                if 97 <= action <= 122 and self.cap_toggle:
-                    self.last_char = action - 32
-                    self.select_point.change_title(action - 32)
-                    self.initial_held = pygame.time.get_ticks()
-                elif 97 <= action <= 122 or \
-                        48 <= action <= 57 or \
-                        action in [33, 44, 46, 47, 58, 63]:
-                    self.last_char = action
-                    self.select_point.change_title(action)
-                    self.initial_held = pygame.time.get_ticks()
-                elif action == pygame.K_SPACE:
-                    self.last_char = -14
-                    self.select_point.change_title(-14)
-                    self.initial_held = pygame.time.get_ticks()
-                elif action == pygame.K_BACKSPACE:
-                    self.last_char = 0
-                    self.select_point.change_title(0)
-                    self.initial_held = pygame.time.get_ticks()
-                else:
-                    self.last_char = None
-
-        if self.current_mode == 2 and True in held and \
-                20 < pygame.time.get_ticks() - \
-                self.held_char_timer and \
-                500 < pygame.time.get_ticks() - self.initial_held and \
-                self.last_char is not None:
-            self.select_point.description.write_page(self.select_point.sel_page,
-                                                     self.last_char)
-            self.held_char_timer = pygame.time.get_ticks()
-        elif self.current_mode == 4 and True in held and \
-                20 < pygame.time.get_ticks() - \
-                self.held_char_timer and \
-                500 < pygame.time.get_ticks() - self.initial_held and \
-                self.last_char is not None:
-            self.select_point.change_title(self.last_char)
-            self.held_char_timer = pygame.time.get_ticks()
-
-        if (self.current_mode == 1 or self.current_mode == 0) and \
-                20 < pygame.time.get_ticks() - self.dir_delay:
-            if held[pygame.K_w]:
-                self.y_offset += 5
-                self.dir_delay = pygame.time.get_ticks()
-            elif held[pygame.K_s]:
-                self.y_offset -= 5
-                self.dir_delay = pygame.time.get_ticks()
-            if held[pygame.K_a]:
-                self.x_offset += 5
-                self.dir_delay = pygame.time.get_ticks()
-            elif held[pygame.K_d]:
-                self.x_offset -= 5
-                self.dir_delay = pygame.time.get_ticks()
-
-    def mode_0(self):
-        # Move and add points
-        point_index = 0
-        mouse_point = DataPoint()
-        mouse_point.change_icon_location(self.mouse.x,
-                                         self.mouse.y)
-        check_select = True
-
-        while 0 < len(self.datapoints) and \
-                (point_index < len(self.datapoints)):
-            if self.select_point is self.datapoints[point_index] and \
-                    self.calculate_mouse(self.datapoints[point_index]) and \
-                    self.mouse.collidelist(self.edit_options) < 0:
-                self.follow_mouse = True
-                check_select = False
-            elif self.calculate_mouse(
-                    self.datapoints[point_index]):
-                self.select_point = self.datapoints[point_index]
-                self.select_point.icon.display_options = True
-                check_select = False
-
-            point_index += 1
-
-        # Update mouse position temporarily
-        temp_mouse = pygame.Rect(self.mouse.x - self.x_offset,
-                                 self.mouse.y - self.y_offset,
-                                 self.mouse.width, self.mouse.height)
-        # When not clicking on a point
-
-        if -1 < temp_mouse.collidelist(self.edit_options) and \
-                self.select_point is not None and \
-                self.select_point.icon.display_options:
-            # Edit options when clicked
-            self.current_mode = temp_mouse.collidelist(
-                self.edit_options) + 1
-
-        elif check_select:
-            # When not clicking on a point
-            check_dist = True
-            for point in self.datapoints:
-                if self.calculate_mouse(point):
-                    check_dist = False
-            if check_dist and self.select_point is None:
-                # Make a new point, only if it's far away from other points
-                # Only make a new point once we deselected our point
-                new_point = DataPoint()
-                new_point.change_icon_location(self.mouse.x - self.x_offset,
-                                               self.mouse.y - self.y_offset)
-                new_point.change_id(self.id_count)
-                self.id_count += 1
-                self.datapoints += [new_point]
-            elif -1 < self.mouse.collidelist(self.rect_colors) and \
-                    self.select_point is not None:
-                self.select_point.change_icon_color(
-                    self.color_options[self.mouse.collidelist(
-                        self.rect_colors)])
-            else:
-                # Deselect our point
-                self.select_point = None
-
-        elif self.select_point is not None:
-            self.update_option_pos()
-
-    def mode_1(self):
-        # On left click, find a valid point to click on that's not our point
-
-        # Change color of lines added
-        if -1 < self.mouse.collidelist(self.rect_colors):
-            self.line_col_ind = self.mouse.collidelist(self.rect_colors)
-        # Adding or removing a line on left click
-        elif 1 < len(self.datapoints):
-            find_point = False
-            point_index = 0
-            while not find_point and point_index < len(self.datapoints):
-                if find_point is not self.select_point:
-                    find_point = self.calculate_mouse(
-                        self.datapoints[point_index])
-                point_index += 1
-
-            if find_point and 0 < len(self.select_point.associated) and \
-                    find_point in self.select_point.associated:
-                self.select_point.remove_point(find_point)
-            elif find_point and 0 < len(find_point.associated) and \
-                    self.select_point in find_point.associated:
-                find_point.remove_point(self.select_point)
-            elif find_point:
-                self.select_point.add_point(find_point, self.color_options[self.line_col_ind])
-            else:
-                self.select_point = None
-                self.show_select = False
-                self.current_mode = 0
-        else:
-            # No other points available, return to default mode
-            self.current_mode = 0
-            self.select_point = None
-            self.show_select = False
-
-    def mode_2(self):
-        # On left click, start typing
-        # todo: Add a left click to select where text goes
-        # Press left and right to move onto the next page
-        if self.mouse.colliderect(self.desc_right):
-            if len(self.select_point.description.pages) - 1 <= self.select_point.sel_page:
-                self.select_point.description.add_page()
-            self.select_point.sel_page += 1
-            self.select_point.description.split_text(self.select_point.sel_page)
-        elif 0 < self.select_point.sel_page and self.mouse.colliderect(self.desc_left):
-            self.select_point.sel_page -= 1
-            self.select_point.description.split_text(self.select_point.sel_page)
-
-        # Left click special rect to leave typing interface
-        if self.mouse.colliderect(self.confirm_rect):
-            self.current_mode = 0
-
-    def mode_3(self):
-        if self.mouse.colliderect(self.confirm_delete):
-            self.current_mode = 0
-            self.show_select = False
-            del self.datapoints[self.datapoints.index(self.select_point)]
-            self.select_point = None
-        elif self.mouse.colliderect(self.confirm_keep):
-            self.current_mode = 0
-
-    def mode_4(self):
-        if self.mouse.colliderect(self.confirm_title):
-            self.select_point.title.font_size = 12
-            self.select_point.title.setup()
-            self.select_point.title.render()
-            self.current_mode = 0
-            self.select_point = None
-            self.show_select = False
-
-    def update(self):
-        if self.select_point is not None and \
-                not self.select_point.icon.display_options:
-            self.select_point = None
-
-        if self.follow_mouse and self.select_point is not None:
-            self.select_point.change_icon_location(self.mouse.x - self.x_offset,
-                                                   self.mouse.y - self.y_offset)
-            self.update_option_pos()
-
-    def render(self, screen):
-        screen.fill(WHITE)
-        self.render_modes[self.current_mode](screen)  # type: ignore
-
-    def render_mode_0(self, screen):
-        # Default rendering mode
-
-        # Render lines under points
-        for each_point in self.datapoints:
-            each_point.render_lines(screen, self.x_offset, self.y_offset)
-
-        # Render points
-        for each_point in self.datapoints:
-            if self.current_mode == 1 and each_point is not self.select_point:
-                # Turn points to rects to show that it's clickable
-                each_point.change_icon_border(0)
-            else:
-                # Circle default rendering with title/text above them
-                each_point.change_icon_border(100)
-                screen.blit(each_point.title.text_img,
-                            [each_point.icon.center[0] - (each_point.title.text_rect.width / 2) + self.x_offset,
-                             each_point.icon.center[1] - (each_point.title.text_rect.height) + self.y_offset])
-            each_point.render(screen, self.x_offset, self.y_offset)
-
-        # Render options
-        if self.select_point and \
-                self.select_point.icon.display_options:
-            for op_ind in range(len(self.edit_options)):
-                pygame.draw.rect(screen, ORANGE, [self.edit_options[op_ind].x + self.x_offset,
-                                                  self.edit_options[op_ind].y + self.y_offset,
-                                                  self.edit_options[op_ind].width,
-                                                  self.edit_options[op_ind].height], 1)
-                if self.option_imgs[op_ind] is not None:
-                    screen.blit(self.option_imgs[op_ind], [self.edit_options[op_ind].x + self.x_offset,
-                                                  self.edit_options[op_ind].y + self.y_offset,
-                                                  self.edit_options[op_ind].width,
-                                                  self.edit_options[op_ind].height])
-
-                # Render the options images on top
-
-        # Render color options
-        if self.select_point:
-            for color in self.rect_colors:
-                color.render(screen)
-
-    def render_mode_1(self, screen):
-        pygame.draw.rect(screen, LIME_GREEN, self.confirm_rect)
-        self.select_point.description.render_page(screen, self.select_point.sel_page)
-        pygame.draw.rect(screen, YELLOW, self.desc_right)
-        pygame.draw.rect(screen, YELLOW, self.desc_left)
-
-    def render_mode_2(self, screen):
-        delete_text = Text("Do you want to delete this point?",
-                           (self.memory.res_width / 2,
-                            self.memory.res_height / 2),
-                           50, "impact", RED, None)
-
-        self.select_point.render(screen, 0, 0)
-        pygame.draw.rect(screen, DARK_RED, self.confirm_keep)
-        pygame.draw.rect(screen, DARK_GREEN, self.confirm_delete)
-        screen.blit(delete_text.text_img, delete_text.text_rect)
-
-    def render_mode_3(self, screen):
-        screen.blit(self.select_point.title.text_img,
-                    self.select_point.title.text_rect)
-        pygame.draw.rect(screen, LIME_GREEN, self.confirm_title)
-
-    def calculate_mouse(self, point_b):
-        """Point a is self.mouse
-        Point b is any datapoint
-        """
-        hitbox_mod = 3  # Radius size, change for more/less cluttering
-
-        if math.sqrt((self.mouse.x - self.x_offset - point_b.icon.center[0]) ** 2 +
-                     (self.mouse.y - self.y_offset - point_b.icon.center[
-                         1]) ** 2) <= point_b.icon.width * hitbox_mod:
-            # Top left corner
-            return point_b
-        elif math.sqrt((self.mouse.x - self.x_offset + self.mouse.width -
-                        point_b.icon.center[0]) ** 2 +
-                       (self.mouse.y - self.y_offset - point_b.icon.center[
-                           1]) ** 2) <= point_b.icon.width * hitbox_mod:
-            # Top right corner
-            return point_b
-        elif math.sqrt((self.mouse.x - self.x_offset - point_b.icon.center[0]) ** 2 +
-                       (self.mouse.y - self.y_offset + self.mouse.height -
-                        point_b.icon.center[
-                            1]) ** 2) <= point_b.icon.width * hitbox_mod:
-            # Bottom left corner
-            return point_b
-        elif math.sqrt((self.mouse.x - self.x_offset + self.mouse.width -
-                        point_b.icon.center[0]) ** 2 +
-                       (self.mouse.y - self.y_offset + self.mouse.height -
-                        point_b.icon.center[
-                            1]) ** 2) <= point_b.icon.width * hitbox_mod:
-            # Bottom right corner
-            return point_b
-        else:
-            # No points detected
-            return None
-
-    def calculate_distance(self, point_a, point_b):
-        """Get distance between point_a and point_b and return point_b
-        if point_a is touching
-        """
-        hitbox_mod = 3  # Radius size, change for more/less cluttering
-
-        if math.sqrt((point_a.icon.center[0] - point_b.icon.center[0]) ** 2 +
-                     (point_a.icon.center[1] -
-                      point_b.icon.center[1]) ** 2) <= \
-                point_b.icon.width * hitbox_mod:
-            return point_b
-        else:
-            # No points detected
-            return None
-
-    def update_option_pos(self):
-        size = 20  # How big each icon should be
-        offset = 10  # How far each icon is from the point
-        for option_ind in range(len(self.edit_options)):
-            self.edit_options[option_ind].x = \
-                self.select_point.icon.center[0] + \
-                (size * option_ind) + offset
-            self.edit_options[option_ind].y = \
-                self.select_point.icon.center[1] - size - offset
-            self.edit_options[option_ind].width = size
-            self.edit_options[option_ind].height = size
-
-    def save_map(self):
-        out_path = os.getcwd()
-        if "save" not in os.listdir(out_path):
-            # Debug here for no save folder
-            return None
-
-        if len(os.listdir(out_path + "/save")) < 1:
-            # Debug here for no map in folder, or just a warning
-            pass
-
-        # todo: Update the map to have a map selector in the future
-
-        new_save = MemoryPoint()
-        new_save.comp_dp(self.datapoints)
-        new_save.pickle_dp(out_path + "/save")
-
-
-class DataPoint:
-    def __init__(self):
-        self.title = Text("", [1280 / 2, 720 / 2], 24, "impact", BLACK, None)
-        self.description = Description()
-        self.icon = Icon(LIME_GREEN, [0, 0], 5, 5)
-        self.associated = []  # Other points related/connecting to this one
-        self.line_color = []  # Line colors for connecting related points
-        self.id = 0
-        self.sel_page = 0
-
-    def change_title(self, in_text):
-        if 0 <= len(self.title.text) < 30 and in_text not in [-14, 0]:
-            self.title.text += chr(in_text)
-        elif in_text == -14 and len(self.title.text) < 30:
-            self.title.text += " "
-        elif in_text == 0 and 0 < len(self.title.text):
-            self.title.text = self.title.text[:-1]
-        self.title.render()
-
-    def change_description(self, in_desc):
-        self.description = [""]
-        desc_len = len(in_desc)
-        max_char = 50  # How many characters per line
-        for each_line in range(0, desc_len, max_char):
-            self.description += [each_line]
-
-    def change_icon_color(self, new_color):
-        self.icon.color = new_color
-
-    def change_icon_location(self, x, y):
-        self.icon.rect.x = x
-        self.icon.rect.y = y
-        self.icon.shadow_rect.x = x + self.icon.width // 3
-        self.icon.shadow_rect.y = y + self.icon.height // 3
-        self.icon.center = self.icon.rect.center
-
-    def change_icon_radius(self, new_radius):
-        self.icon.radius = new_radius
-
-    def change_icon_border(self, new_border):
-        # Also known as "change_icon_edges"
-        self.icon.border = new_border
-
-    def change_id(self, new_id):
-        self.id = new_id
-
-    def add_point(self, in_point, line_color):
-        # Add associated points to connect to this one
-        self.associated += [in_point]
-        self.line_color += [line_color]
-
-    def remove_point(self, in_point):
-        point_index = self.associated.index(in_point)
-        del self.associated[point_index]
-        del self.line_color[point_index]
-
-    def update(self):
-        pass
-
-    def render(self, screen, x_offset, y_offset):
-        self.icon.render(screen, x_offset, y_offset)
-
-    def render_lines(self, screen, x_offset, y_offset):
-        if 0 < len(self.associated):
-            for li in range(len(self.associated)):
-                # Line Shadow
-                pygame.draw.line(screen, DARK_GREY,
-                                 (self.icon.center[0] + x_offset + 1,
-                                  self.icon.center[1] + y_offset + 1),
-                                 (self.associated[li].icon.center[0] + x_offset + 1,
-                                  self.associated[li].icon.center[1] + y_offset + 1), 2)
-
-                # Actual Line
-                pygame.draw.line(screen, self.line_color[li],
-                                 (self.icon.center[0] + x_offset, self.icon.center[1] + y_offset),
-                                 (self.associated[li].icon.center[0] + x_offset,
-                                  self.associated[li].icon.center[1] + y_offset), 2)
-
-
-class Description:
-    def __init__(self):
-        self.pages = [""]
-        self.char_per_line = 40
-        self.font_size = 40
-        self.blink_timer = 0
-        self.current_page = []
-
-    def add_page(self):
-        self.pages += [""]
-
-    def write_page(self, page_num, letter_num):
-        if 0 <= page_num < len(self.pages) and 0 < letter_num and \
-                len(self.pages[page_num]) < (12 * self.char_per_line):
-            self.pages[page_num] += chr(letter_num)
-        elif letter_num < 0:
-            self.pages[page_num] += " "
-        else:
-            self.erase_write(page_num)
-        self.split_text(page_num)
-
-    def erase_write(self, page_num):
-        if 0 <= page_num < len(self.pages) and \
-                0 < len(self.pages[page_num]):
-            self.pages[page_num] = self.pages[page_num][:-1]
-            self.split_text(page_num)
-
-    def split_text(self, page_num):
-        line_list = []
-        check_text = Text("", (self.char_per_line, len(line_list) *
-                               self.font_size * 4 / 5), self.font_size,
-                          "impact", BLACK, None)
-        for each_char in self.pages[page_num]:
-            if check_text.text_rect.width < 1280 - self.font_size:
-                check_text.text += each_char
-                check_text.render()
-            else:
-                line_list += [check_text.text]
-                check_text.text = each_char
-                check_text.render()
-        self.current_page = line_list + [check_text.text]
-
-    def render_page(self, screen, page_num):
-        line_iter = 0
-        end_rect = None
-
-        for each_line in self.current_page:
-            text = Text(each_line, (0, 0), self.font_size, "impact",
-                        BLACK, None)
-            screen.blit(text.text_img, (10, line_iter * (self.font_size + 20)))
-            end_rect = pygame.Rect(text.text_rect.width + 15,
-                                           line_iter * (self.font_size + 20),
-                                           self.font_size / 8, self.font_size)
-            line_iter += 1
-
-        # Render typing bar
-        if 0 < pygame.time.get_ticks() - self.blink_timer < 700:
-            if end_rect:
-                pygame.draw.rect(screen, BLACK, end_rect)
-            else:
-                pygame.draw.rect(screen,
-                                 BLACK,
-                                 [10, 5,
-                                  self.font_size / 8, self.font_size])
-
-        if 1400 < pygame.time.get_ticks() - self.blink_timer:
-            self.blink_timer = pygame.time.get_ticks()
-
-        # Old rendering with an integer limit
-        """if 0 <= page_num < len(self.pages):
-            pos_iter = 0
-            total_words = 13 * self.char_per_line
-            end_rect = None
-
-            for text_index in range(0,
-                                    total_words -
-                                    self.char_per_line,
-                                    self.char_per_line):
-                text = Text(self.pages[page_num][text_index:text_index +
-                                                 self.char_per_line],
-                            (pos_iter + self.char_per_line, text_index),
-                            self.font_size, "impact", BLACK, None)
-                screen.blit(text.text_img, (10,
-                                            text.text_rect.y + 20))
-                pos_iter += 1
-
-                if 0 < len(self.pages[page_num][
-                           text_index:text_index + self.char_per_line]) <= \
-                        self.char_per_line:
-                    end_rect = pygame.Rect(text.text_rect.width + 20,
-                                           text.text_rect.y +
-                                           (text.text_rect.height / 2),
-                                           self.font_size / 4, self.font_size)
-
-            # Render typing bar
-            if 0 < pygame.time.get_ticks() - self.blink_timer < 700:
-                if end_rect:
-                    pygame.draw.rect(screen, BLACK, end_rect)
-                else:
-                    pygame.draw.rect(screen,
-                                     BLACK,
-                                     [10, 5,
-                                      self.font_size / 4, self.font_size])
-
-            if 1400 < pygame.time.get_ticks() - self.blink_timer:
-                self.blink_timer = pygame.time.get_ticks()"""
-
-
-class Icon:
-    def __init__(self, in_color, location, width, height):
-        self.color = in_color
-        self.rect = pygame.Rect(location[0], location[1],
-                                width, height)
-        self.center = self.rect.center
-        self.height = height
-        self.width = width
-        self.border = 0
-        # We add a third of the width/height to proportionally scale shadows
-        self.shadow_rect = pygame.Rect(location[0] + width // 3,
-                                       location[1] + height // 3,
-                                       width, height)
-
-    def render(self, screen, x_offset, y_offset):
-        # Icon shadow
-        pygame.draw.rect(screen, DARK_GREY, [self.shadow_rect.x + x_offset,
-                                             self.shadow_rect.y + y_offset,
-                                             self.shadow_rect.width, self.shadow_rect.height],
-                         border_radius=self.border)
-
-        # Actual icon/button
-        pygame.draw.rect(screen, self.color, [self.rect.x + x_offset,
-                                              self.rect.y + y_offset,
-                                              self.rect.width, self.rect.height],
-                         border_radius=self.border)
-
-
-class Circle:
-    def __init__(self, in_color, location, in_radius):
-        self.color = in_color
-        self.center = location
-        self.radius = in_radius
-
-        self.display_options = False
-
-    def render(self, screen):
-        pygame.draw.circle(screen, self.color, self.center, self.radius)
-
-
-class Rect:
-    def __init__(self, in_color, location, width, height):
-        self.color = in_color
-        self.center = (location[0] - (width / 2),
-                       location[1] - (height / 2))
-        self.height = height
-        self.width = width
-        self.rect = pygame.Rect(location[0], location[1],
-                                width, height)
-
-    def render(self, screen):
-        pygame.draw.rect(screen, self.color, self.rect)
-
-
-class Program:
-    """
-    Class responsible for how the game runs
-    """
-
-    def __init__(self, width, height) -> None:
-        self.running = True  # Determines if the game is running
-        self.memory = Memory(width, height)  # Initialize game memory
-
-    def run(self, width, height, current_scene):
-        """
-        Where the actual game loop is running.
-        Everything game related is defined in scene.
-        Scene is initialized by running Program (in main
-        which is outer scope) with the screen size and scene.
-        At this point in time, scene is run as MenuScene.
-
-        Everything relating to calling the scene is called here, such as
-        input, update, and render while the game is running.
-
-        If the game isn't running, then in the final loop (or the loop when
-        the game is told to close by various means), self.running is set to
-        false and the scene is changed to nothing. Then the game is safe to
-        close.
-
-        This is also where inputs are collected before they are sent to
-        the inputs for scene.
-
-        Finally, this is where FPS is set and where the display is updated.
-        """
-        # self.memory.screen = pygame.display.set_mode([width, height])
-        screen = pygame.display.set_mode([width, height])  # Set screen size
-        self.memory.screen = screen
-
-        pygame.scrap.init()
-        if not pygame.scrap.get_init():
-            raise Exception("pygame.scrap is no longer supported :(")
-
-        # Put the resolution ratio into memory, where 1080 and 576 are the min
-
-        scene = current_scene  # Set scene currently shown through a parameter
-        # Start game loop
-        while self.running:
-            keys_pressed = []  # Keys pressed/tapped (key press)
-            keys_held = pygame.key.get_pressed()  # Keys held collected
-            for event in pygame.event.get():  # Collect all key presses
-                # Quit condition if you press the X on the top right
-                if event.type == pygame.QUIT:
-                    scene.save_map()
-                    self.running = False  # Stop running this loop
-                    pygame.mixer.music.stop()  # Stop the music
-                    scene.run_scene = False  # Tell scene to stop running
-                # If player does a keypress, append to our list for key presses
-                if event.type == pygame.KEYDOWN:
-                    keys_pressed.append(event.key)
-                elif event.type == pygame.MOUSEMOTION or \
-                        event.type == pygame.MOUSEBUTTONDOWN or \
-                        event.type == pygame.MOUSEBUTTONUP:
-                    keys_pressed.append(event.type)
-
-                """if event.type == self.memory.music.end:
-                    self.memory.music.switch_music()"""
-
-            # Stop the game using other conditions (running, but scene says off)
-            if self.running and not scene.run_scene:
-                scene.save_map()
-                self.running = False  # Stop running this loop
-                pygame.mixer.music.stop()  # Stop the music
-                scene.close_game()  # Tell scene to shut off
-            else:
-                # Functional game loop
-
-                scene.input(keys_pressed, keys_held)  # Call to use keys in
-                scene.update()  # Call to dynamically use/update/check changes
-                scene.render(screen)  # Visually render desired graphics
-                scene = scene.this_scene
-                """This line is important to allow changing scenes (if 
-                this_scene is different like using 
-                scene.change_scene(next_scene). Otherwise, scene will not be 
-                changed and will continue being this scene (same memory
-                address, no change)."""
-
-                """if 0 != scene.level_id:
-                    self.memory.music.transition_music()"""
-
-            fps.tick(120)  # 120 frames per second
-            pygame.display.update()  # Update the visual output dynamically
-
-
-if __name__ == "__main__":
-    pygame.init()  # Initialize pygame
-    pygame.mixer.init()  # Initialize pygame's sound
-
-    fps = pygame.time.Clock()  # Initialize the frame rate
-
-    # Alter these values to change the resolution
-    game_width = 1280
-    game_height = 700
-    pygame.display.set_mode([game_width, game_height])
-
-    file_path = "put_icon_file_path_here"
-    """pygame.display.set_caption("display_window") # game window caption
-    icon = pygame.image.load(file_path + "file_image_name") # loading image
-    default_icon_image_size = (32, 32) # reducing size of image
-    icon = pygame.transform.scale(icon, default_icon_image_size) 
-    # scaling image correctly
-    pygame.display.set_icon(icon) # game window icon"""
-
-    start_game = Program(game_width, game_height)
-    # Initialize running the game with Program
-    start_scene = Map(start_game.memory)
-    # Initialize the first scene/starting scene shown to the player
-    start_game.run(game_width, game_height, start_scene)  # Run the game loop
-    """The game loop will be stuck at this line (start_game.run) until the
-    while loop (while self.running:) is no longer true. When self.running is
-    False, the program will move onto the next line to quit"""
-
-    pygame.quit()  # Quit the game/pygame instance
+import pygame
+import pickle
+import gc
+import os
+import math
+import bisect
+import threading
+import json
+import time
+import re
+import argparse
+import hashlib
+from collections import OrderedDict
+
+import code_importer
+
+try:
+    import numpy as np
+except ImportError:
+    np = None   # Only needed for columnar maps, layout and line indexing
+
+DARK_RED = (139, 0, 0)
+YELLOW = (235, 195, 65)
+BLACK = (0, 0, 0)
+ORANGE = (255, 165, 0)
+BLUE = (30, 144, 255)
+CYAN = (47, 237, 237)
+RED = (194, 57, 33)
+LIME_GREEN = (50, 205, 50)
+LIGHT_RED = (255, 0, 0)
+WHITE = (255, 255, 255)
+GREY = (125, 125, 125)
+LIGHT_PINK = (255, 182, 193)
+DARK_GREEN = (1, 100, 32)
+PURPLE = (181, 60, 177)
+BROWN = (150, 75, 0)
+DARK_GREY = (52, 52, 52)
+
+# Scrolling the mouse wheel, sent to scenes alongside key presses
+WHEEL_UP = -1
+WHEEL_DOWN = -2
+
+
+class Memory:
+    """
+    Class used to store data across game instances
+    """
+
+    def __init__(self, width, height, map_format=None):
+        self.res_width = width
+        self.res_height = height
+        # "pickle" or "columns", None keeps the format the map was saved in
+        self.map_format = map_format
+        self.music = None
+        self.dp = []
+        self.memory_manager = MemoryPoint()
+        self.dp = self.memory_manager.depickle_dp("save")
+        self.edges = self.memory_manager.edges  # Lines between self.dp
+        self.screen = None
+
+    def load_game(self):
+        """ Load previous game instance, usually from a text_file"""
+        pass
+
+    def load_scenes(self):
+        """ Load all scenes from a text file"""
+        pass
+
+
+class MemoryPoint:
+    """
+    Class used to manage and hold all storage actions
+    """
+    def __init__(self):
+        # Datapoints:
+        self.dp_titles = []
+        self.dp_desc = []   # Pages of each description
+        self.dp_icons = {}
+        self.dp_lines = {}
+        self.dp_line_colors = {}
+        self.edges = EdgeTable()    # Filled in by build_dp
+        self.dp_rows = None     # Row of each id in dp_titles, for update_dp
+
+    def comp_dp(self, dp_list, edges):
+        # Everything is copied so it can be pickled on another thread, as
+        # plain lists so no objects get built for every point. The garbage
+        # collector is kept from walking the map over and over meanwhile
+        gc.disable()
+        try:
+            self.dp_titles += [dp.title.text for dp in dp_list]
+            self.dp_desc += [dp.description.saved_pages() for dp in dp_list]
+            for dp in dp_list:
+                self.dp_icons[dp.id] = [dp.icon.color, dp.icon.rect.x,
+                                        dp.icon.rect.y, dp.icon.width,
+                                        dp.icon.height]
+                lines = edges.lines_from(dp.id)
+                self.dp_lines[dp.id] = [[other_id] for other_id in lines]
+                self.dp_line_colors[dp.id] = list(lines.values())
+        finally:
+            gc.enable()
+
+    def update_dp(self, point_ids, changed_ids, moved_ids, edges):
+        """Bring a MemoryPoint filled by comp_dp or loaded from disk up to
+        date, copying only the points in changed_ids and just the icons of
+        the points in moved_ids. Changed ids missing from point_ids were
+        deleted
+        """
+        gone_ids = {dp_id for dp_id in changed_ids
+                    if dp_id not in point_ids and dp_id in self.dp_icons}
+        if 0 < len(gone_ids):
+            kept = [dp_id not in gone_ids for dp_id in self.dp_icons]
+            self.dp_titles = [title for title, keep in
+                              zip(self.dp_titles, kept) if keep]
+            self.dp_desc = [pages for pages, keep in
+                            zip(self.dp_desc, kept) if keep]
+            for dp_id in gone_ids:
+                del self.dp_icons[dp_id]
+                del self.dp_lines[dp_id]
+                del self.dp_line_colors[dp_id]
+            self.dp_rows = None
+        # Titles and descriptions are stored in the same order as dp_icons,
+        # where each point is only looked up again after deletes
+        if self.dp_rows is None or \
+                len(self.dp_rows) != len(self.dp_icons):
+            self.dp_rows = {dp_id: row
+                            for row, dp_id in enumerate(self.dp_icons)}
+        rows = self.dp_rows
+
+        for dp_id in changed_ids:
+            dp = point_ids.get(dp_id)
+            if dp is None:
+                continue
+            if dp_id in rows:
+                self.dp_titles[rows[dp_id]] = dp.title.text
+                self.dp_desc[rows[dp_id]] = dp.description.saved_pages()
+            else:
+                rows[dp_id] = len(self.dp_titles)
+                self.dp_titles += [dp.title.text]
+                self.dp_desc += [dp.description.saved_pages()]
+            lines = edges.lines_from(dp_id)
+            self.dp_lines[dp_id] = [[other_id] for other_id in lines]
+            self.dp_line_colors[dp_id] = list(lines.values())
+        for dp_id in changed_ids:
+            dp = point_ids.get(dp_id)
+            if dp is not None:
+                self.dp_icons[dp_id] = [dp.icon.color, dp.icon.rect.x,
+                                        dp.icon.rect.y, dp.icon.width,
+                                        dp.icon.height]
+        for dp_id in moved_ids:
+            dp = point_ids.get(dp_id)
+            if dp is not None and dp_id in self.dp_icons:
+                self.dp_icons[dp_id][1:3] = dp.icon.rect.topleft
+
+    def pickle_dp(self, pickle_path):
+        # Write beside the old map first so a crash never leaves half a map
+        temp_path = pickle_path + "/my_map.tmp"
+        with open(temp_path, "wb") as out_file:
+            pickle.dump(self.dp_titles, out_file)
+            # Pages still in a columnar map are read out as lists
+            pickle.dump([list(pages) for pages in self.dp_desc], out_file)
+            pickle.dump(self.dp_icons, out_file)
+            pickle.dump(self.dp_lines, out_file)
+            pickle.dump(self.dp_line_colors, out_file)
+            out_file.flush()
+            os.fsync(out_file.fileno())
+
+        os.replace(temp_path, pickle_path + "/my_map")
+
+    def depickle_dp(self, pickle_path):
+        if len(os.listdir(pickle_path)) < 1:
+            return []
+
+        # Nearly everything made here is kept, so the garbage collector is
+        # kept from walking the map over and over while it's loaded
+        gc.disable()
+        try:
+            self.load_snapshot(pickle_path)
+            # Edits made since the last snapshot are replayed from the journal
+            for journal_path in MapJournal.journal_paths(pickle_path):
+                self.apply_records(MapJournal.read_records(journal_path))
+            return self.build_dp()
+        finally:
+            gc.enable()
+
+    def save_snapshot(self, pickle_path, map_format="pickle"):
+        if map_format == "columns":
+            ColumnarMap.write(pickle_path + "/my_map.cols", self)
+            stale_path = pickle_path + "/my_map"
+        else:
+            self.pickle_dp(pickle_path)
+            stale_path = pickle_path + "/my_map.cols"
+        # Never leave the other format behind holding an older map
+        if os.path.exists(stale_path):
+            os.remove(stale_path)
+
+    def load_snapshot(self, pickle_path):
+        self.dp_rows = None
+        if os.path.exists(pickle_path + "/my_map.cols"):
+            ColumnarMap(pickle_path + "/my_map.cols").read_into(self)
+            return None
+        if not os.path.exists(pickle_path + "/my_map"):
+            return None
+
+        with open(pickle_path + "/my_map", "rb") as in_file:
+            self.dp_titles = pickle.load(in_file)
+            # Older maps saved whole Description objects
+            self.dp_desc = [description.pages
+                            if isinstance(description, Description)
+                            else description
+                            for description in pickle.load(in_file)]
+            self.dp_icons = pickle.load(in_file)
+            self.dp_lines = pickle.load(in_file)
+            self.dp_line_colors = pickle.load(in_file)
+
+    def apply_records(self, records):
+        """Apply journal records from MapJournal on top of the loaded map.
+
+        Every record sets state rather than changing it relatively, so
+        replaying a journal that is already in the snapshot is harmless
+        """
+        # Titles and descriptions are stored in the same order as dp_icons
+        all_id = list(self.dp_icons.keys())
+        titles = dict(zip(all_id, self.dp_titles))
+        descriptions = dict(zip(all_id, self.dp_desc))
+        # Which points have lines to each point, built at the first delete
+        incoming = None
+
+        for record in records:
+            kind, dp_id = record[0], record[1]
+            if kind == "add":
+                self.dp_icons[dp_id] = list(record[2:])
+                titles[dp_id] = ""
+                descriptions[dp_id] = [""]
+                self.dp_lines[dp_id] = []
+                self.dp_line_colors[dp_id] = []
+            elif dp_id not in self.dp_icons:
+                # Point was deleted later on, nothing left to change
+                continue
+            elif kind == "move":
+                self.dp_icons[dp_id][1:3] = record[2:4]
+            elif kind == "color":
+                self.dp_icons[dp_id][0] = record[2]
+            elif kind == "title":
+                titles[dp_id] = record[2]
+            elif kind == "desc":
+                descriptions[dp_id] = list(record[2])
+            elif kind == "edge" and [record[2]] not in self.dp_lines[dp_id]:
+                self.dp_lines[dp_id] += [[record[2]]]
+                self.dp_line_colors[dp_id] += [record[3]]
+                if incoming is not None:
+                    incoming.setdefault(record[2], set()).add(dp_id)
+            elif kind == "unedge" and [record[2]] in self.dp_lines[dp_id]:
+                line_index = self.dp_lines[dp_id].index([record[2]])
+                del self.dp_lines[dp_id][line_index]
+                del self.dp_line_colors[dp_id][line_index]
+            elif kind == "delete":
+                if incoming is None:
+                    incoming = {}
+                    for other_id, lines in self.dp_lines.items():
+                        for line in lines:
+                            incoming.setdefault(line[0], set()).add(other_id)
+                # Points removed since, or lines removed by unedge, are
+                # left in incoming and skipped here
+                for other_id in incoming.pop(dp_id, ()):
+                    if other_id in self.dp_lines and \
+                            [dp_id] in self.dp_lines[other_id]:
+                        line_index = self.dp_lines[other_id].index([dp_id])
+                        del self.dp_lines[other_id][line_index]
+                        del self.dp_line_colors[other_id][line_index]
+                del self.dp_icons[dp_id]
+                del titles[dp_id]
+                del descriptions[dp_id]
+                del self.dp_lines[dp_id]
+                del self.dp_line_colors[dp_id]
+
+        all_id = list(self.dp_icons.keys())
+        self.dp_titles = [titles[dp_id] for dp_id in all_id]
+        self.dp_desc = [descriptions[dp_id] for dp_id in all_id]
+        self.dp_rows = None
+
+    def build_dp(self):
+        dp_list = []
+        dp_dict = {}
+
+        all_id = list(self.dp_icons.keys())
+        # Create datapoint list
+        for dp_index, dp_id in enumerate(all_id):
+            # Titles and descriptions are laid out once they're first seen
+            new_point = DataPoint(12, True)
+            # todo: add more stuff to dp and method call here respectively
+            new_point.title.text = self.dp_titles[dp_index]
+            new_point.change_icon_location(self.dp_icons[dp_id][1],
+                                           (self.dp_icons[dp_id][2]))
+            new_point.change_icon_color(self.dp_icons[dp_id][0])
+            new_point.change_id(dp_id)
+            pages = self.dp_desc[dp_index]
+            if isinstance(pages, StoredPages):
+                # Left in the columnar map until the description is read
+                new_point.description.load_later(pages)
+            else:
+                # Copied, this MemoryPoint can be kept as the map last saved
+                new_point.description.pages = list(pages)
+
+            dp_list += [new_point]
+            dp_dict[dp_id] = new_point
+        # Make lines by establishing connections in our current datapoints
+        for dp_id in all_id:
+            for line, line_color in zip(self.dp_lines[dp_id],
+                                        self.dp_line_colors[dp_id]):
+                # Older saves can point at datapoints that were deleted
+                if line[0] in dp_dict:
+                    self.edges.add(dp_id, line[0], line_color)
+
+        return dp_list
+
+
+class MapJournal:
+    """
+    Class used to append map edits as small records to a journal next to
+    my_map, and to fold old journal segments back into my_map on a
+    background thread
+    """
+
+    def __init__(self, save_path, map_format=None):
+        self.save_path = save_path
+        self.journal_path = save_path + "/my_map.journal"
+        # Snapshots are written in the format the map was saved in, unless
+        # another one was asked for
+        self.map_format = map_format or self.saved_format(save_path) or \
+            "pickle"
+        if self.map_format == "columns" and np is None:
+            raise ImportError("numpy is needed to save columnar maps")
+        self.out_file = None
+        # Records written to the active journal, none means my_map (or a
+        # snapshot being written) already holds every edit
+        self.record_count = 0
+        self.compact_after = 500    # Records before compacting on our own
+        self.worker = None  # Thread folding segments into my_map
+        self.snapshots_written = 0  # Snapshots from save_snapshot on disk
+
+        # Seal whatever the last session left so a record cut short by a
+        # crash never sits in front of new records
+        self.rotate()
+
+    @staticmethod
+    def saved_format(save_path):
+        # Format of the map in save_path, None when nothing was saved yet
+        if os.path.exists(save_path + "/my_map.cols"):
+            return "columns"
+        if os.path.exists(save_path + "/my_map"):
+            return "pickle"
+        return None
+
+    @staticmethod
+    def journal_paths(save_path, include_active=True):
+        """Return rotated segments oldest first, then the active journal"""
+        segment_nums = []
+        for file_name in os.listdir(save_path):
+            segment_num = file_name[len("my_map.journal."):]
+            if file_name.startswith("my_map.journal.") and \
+                    segment_num.isdigit():
+                segment_nums += [int(segment_num)]
+
+        journal_paths = [save_path + "/my_map.journal." + str(segment_num)
+                         for segment_num in sorted(segment_nums)]
+        if include_active and os.path.exists(save_path + "/my_map.journal"):
+            journal_paths += [save_path + "/my_map.journal"]
+        return journal_paths
+
+    @staticmethod
+    def read_records(journal_path):
+        records = []
+        with open(journal_path, "rb") as in_file:
+            while True:
+                try:
+                    records += [pickle.load(in_file)]
+                except (EOFError, pickle.UnpicklingError, ValueError):
+                    # End of the journal, or a record cut off by a crash
+                    break
+        return records
+
+    def record(self, *record):
+        if self.out_file is None:
+            self.out_file = open(self.journal_path, "ab")
+        pickle.dump(record, self.out_file)
+        self.out_file.flush()
+        self.record_count += 1
+
+        if self.compact_after <= self.record_count:
+            self.compact()
+
+    def rotate(self):
+        # Close the active journal and rename it into the newest segment
+        if self.out_file is not None:
+            self.out_file.close()
+            self.out_file = None
+        self.record_count = 0
+        if not os.path.exists(self.journal_path):
+            return None
+
+        segment_num = 0
+        segment_paths = self.journal_paths(self.save_path, False)
+        if 0 < len(segment_paths):
+            segment_num = int(segment_paths[-1].split(".")[-1]) + 1
+        os.replace(self.journal_path,
+                   self.journal_path + "." + str(segment_num))
+
+    def is_busy(self):
+        return self.worker is not None and self.worker.is_alive()
+
+    def save_snapshot(self, snapshot):
+        """Write a MemoryPoint filled by comp_dp on the main thread into
+        my_map on the worker thread
+        """
+        if self.is_busy():
+            return None
+        # The snapshot already holds every record journaled so far
+        self.rotate()
+        self.worker = threading.Thread(
+            target=self.write_snapshot,
+            args=(snapshot, self.journal_paths(self.save_path, False)))
+        self.worker.start()
+
+    def write_snapshot(self, snapshot, segment_paths):
+        snapshot.save_snapshot(self.save_path, self.map_format)
+        self.snapshots_written += 1
+        for segment_path in segment_paths:
+            os.remove(segment_path)
+
+    def compact(self):
+        if self.is_busy():
+            return None
+        self.rotate()
+        self.worker = threading.Thread(target=self.compact_segments)
+        self.worker.start()
+
+    def compact_segments(self):
+        # Only sealed segments are touched, the active journal stays ours
+        segment_paths = self.journal_paths(self.save_path, False)
+        if len(segment_paths) < 1:
+            return None
+
+        snapshot = MemoryPoint()
+        snapshot.load_snapshot(self.save_path)
+        for segment_path in segment_paths:
+            snapshot.apply_records(self.read_records(segment_path))
+        snapshot.save_snapshot(self.save_path, self.map_format)
+
+        # Safe to drop now, replaying them again would change nothing
+        for segment_path in segment_paths:
+            os.remove(segment_path)
+
+    def wait(self):
+        if self.worker is not None:
+            self.worker.join()
+
+    def close(self):
+        # Every record is already flushed, the next load replays them and
+        # the next snapshot folds them into my_map
+        if self.out_file is not None:
+            self.out_file.close()
+            self.out_file = None
+        self.wait()
+
+
+class ColumnarMap:
+    """
+    Class used to store a map as fixed width NumPy columns inside one file:
+    positions, colors and ids per point, edges as a CSR adjacency and text
+    as offset indexed UTF-8 blobs. Opening a map only memory maps the file,
+    columns are paged in by the OS as they get read
+    """
+    magic = b"ICMCOLS1"
+    alignment = 64  # Every column starts on a multiple of this
+
+    def __init__(self, map_path):
+        if np is None:
+            raise ImportError("numpy is needed to open columnar maps")
+        self.map_path = map_path
+        with open(map_path, "rb") as in_file:
+            if in_file.read(len(self.magic)) != self.magic:
+                raise ValueError(map_path + " is not a columnar map")
+            header_size = int.from_bytes(in_file.read(8), "little")
+            header = json.loads(in_file.read(header_size).decode("utf-8"))
+
+        data_start = self.align(len(self.magic) + 8 + header_size)
+        raw = np.memmap(map_path, np.uint8, "r")
+        self.columns = {}
+        for name, (dtype, shape, offset) in header.items():
+            column_bytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+            self.columns[name] = raw[data_start + offset:
+                                     data_start + offset + column_bytes]\
+                .view(dtype).reshape(shape)
+
+    def __len__(self):
+        return len(self.columns["ids"])
+
+    @classmethod
+    def align(cls, size):
+        return -(-size // cls.alignment) * cls.alignment
+
+    @staticmethod
+    def pack_strings(strings):
+        # Offsets has one more entry than strings, string i is
+        # blob[offsets[i]:offsets[i + 1]]
+        encoded = [each_string.encode("utf-8") for each_string in strings]
+        offsets = np.zeros(len(encoded) + 1, np.int64)
+        offsets[1:] = np.cumsum([len(each_bytes) for each_bytes in encoded])
+        blob = np.frombuffer(b"".join(encoded), np.uint8)
+        return offsets, blob
+
+    @classmethod
+    def write(cls, map_path, memory_point):
+        if np is None:
+            raise ImportError("numpy is needed to save columnar maps")
+        all_id = list(memory_point.dp_icons.keys())
+        rows = {dp_id: row for row, dp_id in enumerate(all_id)}
+
+        columns = {"ids": np.array(all_id, np.int64),
+                   "colors": np.array([memory_point.dp_icons[dp_id][0]
+                                       for dp_id in all_id],
+                                      np.uint8).reshape(-1, 3),
+                   "icons": np.array([memory_point.dp_icons[dp_id][1:5]
+                                      for dp_id in all_id],
+                                     np.int32).reshape(-1, 4)}
+
+        # Edges of row r are edge_rows[edge_offsets[r]:edge_offsets[r + 1]]
+        edge_counts = []
+        edge_rows = []
+        edge_colors = []
+        for dp_id in all_id:
+            edge_count = 0
+            for line, line_color in zip(memory_point.dp_lines[dp_id],
+                                        memory_point.dp_line_colors[dp_id]):
+                if line[0] in rows:
+                    edge_rows += [rows[line[0]]]
+                    edge_colors += [line_color]
+                    edge_count += 1
+            edge_counts += [edge_count]
+        columns["edge_offsets"] = np.zeros(len(all_id) + 1, np.int64)
+        columns["edge_offsets"][1:] = np.cumsum(edge_counts)
+        columns["edge_rows"] = np.array(edge_rows, np.int64)
+        columns["edge_colors"] = np.array(edge_colors, np.uint8).reshape(-1, 3)
+
+        columns["title_offsets"], columns["title_blob"] = \
+            cls.pack_strings(memory_point.dp_titles)
+        # Pages of row r are pages page_offsets[r] to page_offsets[r + 1]
+        columns["page_offsets"] = np.zeros(len(all_id) + 1, np.int64)
+        columns["page_offsets"][1:] = np.cumsum(
+            [len(pages) for pages in memory_point.dp_desc])
+        columns["text_offsets"], columns["text_blob"] = cls.pack_strings(
+            [page for pages in memory_point.dp_desc for page in pages])
+
+        header = {}
+        data_size = 0
+        for name, column in columns.items():
+            header[name] = [column.dtype.str, list(column.shape), data_size]
+            data_size += cls.align(column.nbytes)
+        header_bytes = json.dumps(header).encode("utf-8")
+        data_start = cls.align(len(cls.magic) + 8 + len(header_bytes))
+
+        # Written beside the old map first so a crash never leaves half a map
+        temp_path = map_path + ".tmp"
+        with open(temp_path, "wb") as out_file:
+            out_file.write(cls.magic)
+            out_file.write(len(header_bytes).to_bytes(8, "little"))
+            out_file.write(header_bytes)
+            for name, column in columns.items():
+                out_file.seek(data_start + header[name][2])
+                out_file.write(np.ascontiguousarray(column).tobytes())
+            out_file.truncate(data_start + data_size)
+            out_file.flush()
+            os.fsync(out_file.fileno())
+
+        os.replace(temp_path, map_path)
+
+    def strings(self, offsets_name, blob_name):
+        # Every string packed by pack_strings, decoded in one go
+        blob = self.columns[blob_name].tobytes()
+        offsets = self.columns[offsets_name].tolist()
+        return [blob[start:end].decode("utf-8")
+                for start, end in zip(offsets, offsets[1:])]
+
+    def pages(self, row):
+        page_offsets = self.columns["page_offsets"]
+        text_offsets = self.columns["text_offsets"]
+        return [bytes(self.columns["text_blob"][
+                      text_offsets[page]:text_offsets[page + 1]])
+                .decode("utf-8")
+                for page in range(page_offsets[row], page_offsets[row + 1])]
+
+    def page_count(self, row):
+        page_offsets = self.columns["page_offsets"]
+        return int(page_offsets[row + 1] - page_offsets[row])
+
+    def read_into(self, memory_point):
+        """Fill a MemoryPoint's containers, in the same layout as
+        MemoryPoint.load_snapshot reads from a pickled map. Descriptions
+        are left in the file as StoredPages, only read once they're used
+        """
+        all_id = self.columns["ids"].tolist()
+        colors = list(map(tuple, self.columns["colors"].tolist()))
+        icons = self.columns["icons"].tolist()
+        edge_offsets = self.columns["edge_offsets"].tolist()
+        # Ids of the points each line goes to, looked up all at once
+        edge_lines = [[other_id] for other_id in
+                      self.columns["ids"][self.columns["edge_rows"]].tolist()]
+        edge_colors = list(map(tuple, self.columns["edge_colors"].tolist()))
+
+        memory_point.dp_titles = self.strings("title_offsets", "title_blob")
+        memory_point.dp_desc = [StoredPages(self, row)
+                                for row in range(len(all_id))]
+        memory_point.dp_icons = {dp_id: [color] + icon for dp_id, color, icon
+                                 in zip(all_id, colors, icons)}
+        memory_point.dp_lines = {}
+        memory_point.dp_line_colors = {}
+        for row, dp_id in enumerate(all_id):
+            start, end = edge_offsets[row], edge_offsets[row + 1]
+            memory_point.dp_lines[dp_id] = edge_lines[start:end]
+            memory_point.dp_line_colors[dp_id] = edge_colors[start:end]
+
+
+class StoredPages:
+    """
+    Class used to stand in for the pages of a description still in a
+    columnar map. It reads like the list of pages, which are decoded from
+    the memory mapped file every time
+    """
+
+    def __init__(self, columnar_map, row):
+        self.columnar_map = columnar_map
+        self.row = row
+
+    def __len__(self):
+        return self.columnar_map.page_count(self.row)
+
+    def __iter__(self):
+        return iter(self.load())
+
+    def load(self):
+        return self.columnar_map.pages(self.row)
+
+
+class FontRegistry:
+    """
+    Class used to share a single pygame font for each font type and size
+    between every Text object
+    """
+    fonts = {}  # (font_type, font_size) -> pygame font
+    advances = {}   # (font_type, font_size, character) -> width in pixels
+
+    @classmethod
+    def get_font(cls, font_type, font_size):
+        key = (font_type, font_size)
+        if key not in cls.fonts:
+            cls.fonts[key] = pygame.font.SysFont(font_type, font_size)
+        return cls.fonts[key]
+
+    @classmethod
+    def get_advance(cls, font_type, font_size, character):
+        # Measured once per glyph instead of rendering text to measure it
+        key = (font_type, font_size, character)
+        if key not in cls.advances:
+            cls.advances[key] = cls.get_font(font_type,
+                                             font_size).size(character)[0]
+        return cls.advances[key]
+
+
+class SurfaceCache:
+    """
+    Class used to reuse rendered text surfaces, evicting the least recently
+    used ones once they take up more than max_bytes
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.used_bytes = 0
+        self.surfaces = OrderedDict()
+        # (text, font_type, font_size, color) -> rendered surface
+
+    def render(self, text, font_type, font_size, color):
+        key = (text, font_type, font_size, tuple(color))
+        if key in self.surfaces:
+            self.surfaces.move_to_end(key)
+            return self.surfaces[key]
+
+        surface = FontRegistry.get_font(font_type, font_size).render(
+            text, True, color)
+        self.surfaces[key] = surface
+        self.used_bytes += surface.get_pitch() * surface.get_height()
+
+        # Always keep the surface we just made, even if it's huge
+        while self.max_bytes < self.used_bytes and 1 < len(self.surfaces):
+            old_surface = self.surfaces.popitem(last=False)[1]
+            self.used_bytes -= old_surface.get_pitch() * \
+                old_surface.get_height()
+        return surface
+
+
+TEXT_SURFACES = SurfaceCache(8 * 1024 * 1024)   # Shared by pages and dialogs
+
+
+class Text:
+    """
+    Class used to simplify text creation for pygame
+    """
+
+    def __init__(self, text, text_pos, font_size, font_type,
+                 font_color, text_other, lazy=False):
+        self.text = text  # Text as a string
+        self.position = text_pos  # Text position as a tuple or list (x and y)
+        self.font_size = int(font_size)  # Int determining how big the text is
+        self.font_type = font_type  # String used to indicate what font
+        """Font selection is determined by your computer and it's preset fonts
+        """
+        self.color = font_color
+        """A constant string for a tuple or a tuple using RGB values"""
+        self.other = text_other
+        """PLACEHOLDER for any other variables needed or desired in text"""
+        self.font = None  # Initialized here, defined in setup()
+        self.text_rect = None  # Initialized here, defined in render()
+        self.text_img = None  # Initialized here, defined in render()
+
+        if not lazy:
+            self.setup()  # Called to set up the font
+            self.render()
+            """Called to continuously update the position, rect, color, and
+            text
+            """
+        # Lazy text waits for prepare() before making its font and image
+
+    def setup(self):
+        """
+        Uses font type and size to translate into pygame text font
+        to make self.font, shared through FontRegistry
+        """
+        self.font = FontRegistry.get_font(self.font_type, self.font_size)
+
+    def render(self):
+        """
+        Creates self.text_img or the pygame image of the text using self.text,
+            self.color.
+        Creates self.text_rect, or a rect object using the size of the text.
+        Then centers the rect around the text (or the defined position)
+        """
+        if self.font is None:
+            self.setup()
+        self.text_img = self.font.render(self.text, True, self.color)
+        self.text_rect = self.text_img.get_rect()
+        self.text_rect.center = self.position
+
+    def prepare(self):
+        # Only lazy text that was never rendered has no image yet
+        if self.text_img is None:
+            self.render()
+
+    def scale(self, width, height):
+        self.position = list(self.position)
+        self.position[0] = int(self.position[0] * width)
+        self.position[1] = int(self.position[1] * height)
+        self.position = tuple(self.position)
+        self.font_size = int(self.font_size * max(width, height))
+
+        # Apply those changes
+        self.setup()
+        self.render()
+
+
+class Scene:
+    """
+    Class template for creating scene based games
+    """
+
+    def __init__(self):
+        """
+        self.this_scene will tell the current scene it's on at that moment.
+        Currently, it's set to itself, which means the
+        current scene is this one.
+        """
+        self.this_scene = self
+        self.run_scene = True
+        self.level_id = -1
+        self.track_dirty = False    # Set by scenes that report dirty_rects
+        self.redraw_all = True  # Whole screen needs rendering and updating
+        self.dirty_rects = []   # Screen areas changed since the last frame
+
+    def input(self, pressed, held, typed=""):
+        # this will be overridden in subclasses
+        """
+        This function should contain the pressed for loop and other held
+        buttons. Pressing or holding these buttons should cause something
+        to change such as a class variable (+= 1, True/False, change str.. etc.)
+        or call another function.
+
+        :param pressed: Detect buttons that are pressed (like if held, it will
+        only be updated with the initial press)
+        :param held: Detect buttons that are held down
+        :param typed: Text typed since the last frame, in order, with "\b"
+        for each backspace
+        :return:
+        """
+        pass
+
+    def update(self):
+        # this will be overridden in subclasses
+        """
+        This function should check for variables that need to be updated
+        continuously. A good way to distinguish this from input is that this
+        update function doesn't directly respond from a button press. For
+        example, let's have input add to self.x by 1, or self.x += 1. Then, if
+        we wanted to keep self.x within the bounds of 0 to 10, we check for that
+        in update. In update, we'd use if self.x < 0 and 10 < self.x to check
+        whenever self.x goes out of these bounds to then reset self.x.
+
+        :return:
+        """
+        pass
+
+    def render(self, screen):
+        # this will be overridden in subclasses
+        """
+        This function is solely used for rendering purposes such as
+        screen.blit or pygame.draw
+        :param screen:
+        :return:
+        """
+        pass
+
+    def mark_dirty(self, rect=None):
+        """
+        Report a screen area that changed and needs to be rendered and
+        updated again. Without a rect, the whole screen is redrawn.
+        """
+        if rect is None:
+            self.redraw_all = True
+        else:
+            self.dirty_rects += [pygame.Rect(rect)]
+
+    def clear_dirty(self):
+        """
+        Called by the main pygame loop once a frame has been shown. Scenes
+        not tracking their changes keep redrawing every frame.
+        """
+        self.dirty_rects = []
+        self.redraw_all = not self.track_dirty
+
+    def idle_timeout(self):
+        """
+        Used by the main pygame loop to know how many milliseconds it can
+        sleep waiting for an event before the scene needs another frame.
+        0 keeps the loop running at the full frame rate, None sleeps until
+        the next event.
+        """
+        return 0
+
+    def change_scene(self, next_scene):
+        """
+        This function is used in the main pygame loop. This function is
+        responsible for formally changing the scene
+        """
+        self.this_scene = next_scene
+
+    def close_game(self):
+        """
+        Set the current scene to nothing and is used to stop the game.
+        This function is responsible for ending the game loop (or scene)
+        formally.
+        """
+        self.change_scene(None)
+
+
+class Map(Scene):
+    def __init__(self, memory):
+        Scene.__init__(self)
+
+        self.memory = memory
+        self.track_dirty = True
+
+        self.datapoints = self.memory.dp
+        self.edges = self.memory.edges
+        self.point_ids = {each_point.id: each_point
+                          for each_point in self.datapoints}
+        # Where each point sits in self.datapoints, so it's removed in O(1)
+        self.point_rows = {each_point.id: row
+                           for row, each_point in enumerate(self.datapoints)}
+        # Grid cells must stay larger than the hit radius below
+        self.point_grid = SpatialGrid(64, 8)
+        # Lines are bucketed too, so tiles only draw the lines crossing them
+        self.line_grid = LineGrid(512, self.point_ids, 8)
+        self.line_grid.rebuild(self.edges)
+        self.edges.line_grid = self.line_grid
+        self.hit_radius = 32    # Covers icon.width * hitbox_mod plus the mouse
+        self.view_margin = 200  # Covers half of the widest title around a point
+        # Unselected points and lines are drawn once into cached tiles
+        self.static_layer = StaticLayer(256, 64)
+        self.layer_selected = None  # Point the tiles were drawn without
+        # Overview of the whole map in the bottom right corner
+        self.minimap = Minimap(pygame.Rect(self.memory.res_width - 210,
+                                           self.memory.res_height - 130,
+                                           200, 120))
+        for each_point in self.datapoints:
+            each_point.owner = self
+            each_point.description.owner = each_point
+            self.point_grid.insert(each_point)
+        self.mouse = pygame.Rect(0, 0, 1, 1)
+        self.select_point = None
+        self.show_select = False
+        self.sort_mode = 0
+
+        self.x_offset = 0
+        self.y_offset = 0
+        self.dir_delay = pygame.time.get_ticks()
+
+        # Screen position = map position * zoom + offset
+        self.zoom_step = 1.25
+        self.zoom_level = 0     # Zoom is zoom_step ** zoom_level
+        self.min_zoom_level = -18
+        self.max_zoom_level = 0
+        self.zoom = 1.0
+        # Level of detail, everything is drawn in full at zoom 1
+        self.min_title_size = 8     # Smaller titles on screen are hidden
+        self.cluster_zoom = 0.2     # Below this, points are drawn as clusters
+        self.cluster_size = 12  # Smallest cluster cell on screen, in pixels
+
+        self.follow_mouse = False
+
+        self.edit_options = [pygame.Rect(1, 1, 1, 1),  # Make connections
+                             pygame.Rect(2, 2, 1, 1),  # None
+                             pygame.Rect(3, 3, 1, 1),
+                             pygame.Rect(4, 4, 1, 1)]  # None
+        self.edit_modes = [self.mode_0,
+                           self.mode_1,
+                           self.mode_2,
+                           self.mode_3,
+                           self.mode_4,
+                           self.mode_5,
+                           self.mode_6
+                           ]
+        self.current_mode = 0
+        """
+        Reflects the corresponding edit options in human indices
+        1: icon color
+        2: icon location
+        3: icon radius
+        5: searching, opened with ctrl + f
+        6: graph queries, opened with ctrl + g
+        
+        We reserve 0 for no options
+        """
+        self.render_modes = [self.render_mode_0,
+                             self.render_mode_0,
+                             self.render_mode_1,
+                             self.render_mode_2,
+                             self.render_mode_3,
+                             self.render_mode_4,
+                             self.render_mode_5]
+        # Render modes reflect self.current_mode as well
+
+        self.color_options = [DARK_RED, DARK_GREEN, DARK_GREY,
+                              RED, LIME_GREEN, GREY,
+                              BLUE, YELLOW, ORANGE,
+                              CYAN, PURPLE]
+        self.rect_colors = []
+        self.line_col_ind = 0
+        x, y = 0, 0
+        width, height = 20, 20
+        color_per_row = 3
+        color_iter = 0
+        for color in self.color_options:
+            self.rect_colors += [Rect(color, [x + (width * color_iter),
+                                              y],
+                                      width, height)]
+
+            if color_per_row - 2 < color_iter:
+                y += height
+                color_iter = 0
+            else:
+                color_iter += 1
+
+        if 0 < len(self.memory.memory_manager.dp_icons):
+            self.id_count = max(list(
+                self.memory.memory_manager.dp_icons.keys())) + 1
+        else:
+            self.id_count = 0
+
+        self.confirm_rect = pygame.Rect(self.memory.res_width - 30,
+                                        self.memory.res_height - 30,
+                                        30, 30)     # Exit description mode
+        self.desc_right = pygame.Rect(self.memory.res_width - 30,
+                                      self.memory.res_height - 90, 30, 30)      # Go right/next page
+        self.desc_left = pygame.Rect(30, self.memory.res_height - 90, 30, 30)   # Go left/previous page
+        self.text = ""
+        # Arrow keys move the typing bar by (lines, characters)
+        self.cursor_steps = {pygame.K_UP: (-1, 0), pygame.K_DOWN: (1, 0),
+                             pygame.K_LEFT: (0, -1), pygame.K_RIGHT: (0, 1)}
+
+        self.confirm_delete = pygame.Rect(((self.memory.res_width * 2) // 3,
+                                          (self.memory.res_height * 2) // 3,
+                                          30, 30))      # Click to delete a point
+        self.confirm_keep = pygame.Rect((self.memory.res_width // 3,
+                                        (self.memory.res_height * 2) // 3,
+                                        30, 30))        # Click to not delete a point
+
+        # Edits get journaled instead of re-pickling the whole map
+        self.journal = None
+        if "save" in os.listdir(os.getcwd()):
+            self.journal = MapJournal(os.getcwd() + "/save",
+                                      self.memory.map_format)
+        self.autosave_delay = 30000     # Milliseconds between autosaves
+        self.autosave_timer = pygame.time.get_ticks()
+        # Layouts and big imports change the map without journaling it, so
+        # a snapshot has to hold them, even when quitting
+        self.unjournaled = False
+        # The map as of the last snapshot, only points changed since then
+        # are copied into the next one
+        self.saved_copy = None
+        if self.memory.memory_manager.dp_icons.keys() == \
+                self.point_ids.keys():
+            self.saved_copy = self.memory.memory_manager
+        self.unsaved_ids = set()    # Points changed or deleted since
+        self.moved_ids = set()  # Points only moved since
+        # A map saved in another format than the one asked for is written
+        # again by the next snapshot
+        if self.journal is not None and \
+                MapJournal.saved_format(self.journal.save_path) not in \
+                [None, self.journal.map_format]:
+            self.unjournaled = True
+
+        # Built the first time searching is opened, then kept up to date
+        self.search_index = None
+        self.search_text = ""
+        self.search_results = []    # Ids of the points found
+        self.search_pick = 0    # Result picked with enter
+        self.result_rects = []  # Click on a result to go to it
+        self.search_box = pygame.Rect(self.memory.res_width / 2 - 250, 20,
+                                      500, 40)
+
+        # Auto-layout started with ctrl + l, run a little every frame
+        self.layout = None
+        self.layout_budget = 6  # Milliseconds of layout work per frame
+        # Grids and tiles get rebuilt once after, not per move
+        self.moving_many = False
+        self.layout_rect = pygame.Rect(10, self.memory.res_height - 30,
+                                       300, 30)
+
+        # Source trees imported with import_code, by their path
+        self.code_caches = {}
+        # Caches of big imports are saved once a snapshot holds the points
+        # they name: waiting for the next snapshot, then for it to finish
+        self.unsnapshotted_caches = []
+        self.snapshot_caches = []
+        self.cache_snapshot = 0     # Snapshot snapshot_caches wait for
+        self.journal_limit = 500   # Bigger imports are saved as one snapshot
+
+        # Paths, neighborhoods and components are kept until lines change
+        self.graph = GraphQueries(self.edges)
+        self.query_start = None     # Point paths and neighborhoods start at
+        self.query_end = None   # Point the shortest path goes to
+        self.query_hops = 0     # How many hops of neighbors are shown
+        self.show_components = False
+
+        self.confirm_title = pygame.Rect(self.memory.res_width / 2,
+                                         (self.memory.res_height / 2) + 60,
+                                         30, 30)
+        # Static dialog text only needs to be rendered once
+        self.delete_text = Text("Do you want to delete this point?",
+                                (self.memory.res_width / 2,
+                                 self.memory.res_height / 2),
+                                50, "impact", RED, None)
+
+        img_path = "assets/images/"
+        self.option_imgs = [None, None, None, None]
+        self.confirm_img = pygame.image.load(img_path +
+                                             "ICM_ID1_48x48_Check.png").convert_alpha()
+        self.decline_img = pygame.image.load(img_path +
+                                             "ICM_ID0_48x48_X.png").convert_alpha()
+        op_1 = pygame.image.load(img_path + "ICM_ID2_48x48_LineConnect.png").convert_alpha()
+        op_2 = pygame.image.load(img_path + "ICM_ID3_48x48_TypeDesc.png").convert_alpha()
+        self.option_imgs = [pygame.transform.scale(op_1, [20, 20]),
+                            pygame.transform.scale(op_2, [20, 20]),
+                            None,
+                            None]
+
+    def input(self, pressed, held, typed=""):
+        # Anything other than moving the mouse can change the whole screen
+        for action in pressed:
+            if action != pygame.MOUSEMOTION:
+                self.mark_dirty()
+        ctrl_held = pygame.key.get_mods() & pygame.KMOD_CTRL
+
+        for action in pressed:
+            if action == pygame.MOUSEMOTION:
+                self.mouse.x = pygame.mouse.get_pos()[0]
+                self.mouse.y = pygame.mouse.get_pos()[1]
+
+            if action == pygame.MOUSEBUTTONDOWN:
+                # This can be put here since only current_mode 4 is only being affected
+                if self.current_mode == 4:
+                    self.select_point.title.font_size = 30
+                    self.select_point.title.setup()
+                    self.select_point.title.render()
+
+                if self.current_mode in [0, 1, 6] and \
+                        0 < len(self.datapoints) and \
+                        self.mouse.colliderect(self.minimap.panel):
+                    # Clicking the minimap jumps the view there instead
+                    self.jump_to(*self.minimap.to_map(self.mouse.x,
+                                                      self.mouse.y))
+                else:
+                    # Different modes when pressing left click
+                    self.edit_modes[self.current_mode]()
+
+            if action == pygame.MOUSEBUTTONUP and self.follow_mouse:
+                self.follow_mouse = False
+                if self.select_point is not None:
+                    self.record_edit("move", self.select_point.id,
+                                     self.select_point.icon.rect.x,
+                                     self.select_point.icon.rect.y)
+
+            if action == pygame.K_ESCAPE:
+                if self.current_mode == 5 or self.current_mode == 6:
+                    # Stop searching or querying instead of closing the map
+                    self.current_mode = 0
+                else:
+                    self.run_scene = False
+
+            if (self.current_mode == 2 or self.current_mode == 4) and \
+                    (action == pygame.K_c or action == pygame.K_v) and \
+                    ctrl_held:
+                if action == pygame.K_c:
+                    self.copy_text()
+                else:
+                    self.paste_text()
+                continue
+            if self.current_mode == 0 and action == pygame.K_f and ctrl_held:
+                self.open_search()
+                continue
+            if self.current_mode == 0 and action == pygame.K_g and ctrl_held:
+                self.open_query()
+                continue
+            if self.current_mode == 0 and action == pygame.K_l and ctrl_held:
+                if self.layout is None:
+                    self.start_layout()
+                else:
+                    # Pressing it again stops the layout where it is
+                    self.apply_layout()
+                    self.layout = None
+                continue
+
+            if self.current_mode in [0, 1, 6]:
+                # W, A, S and D pan while held, below
+                if action == WHEEL_UP:
+                    self.zoom_at(self.mouse.x, self.mouse.y, 1)
+                elif action == WHEEL_DOWN:
+                    self.zoom_at(self.mouse.x, self.mouse.y, -1)
+
+            if self.current_mode == 2:
+                # Typing mode, the text itself comes in through typed
+                if action in self.cursor_steps:
+                    self.select_point.description.step_cursor(
+                        self.select_point.sel_page,
+                        *self.cursor_steps[action])
+
+            elif self.current_mode == 5:
+                if action == pygame.K_DOWN and \
+                        self.search_pick < len(self.search_results) - 1:
+                    self.search_pick += 1
+                elif action == pygame.K_UP and 0 < self.search_pick:
+                    self.search_pick -= 1
+                elif action == pygame.K_RETURN and \
+                        0 < len(self.search_results):
+                    self.pick_result(self.search_pick)
+
+            elif self.current_mode == 6:
+                # Number keys pick how many hops of neighbors to show
+                if pygame.K_0 <= action <= pygame.K_9:
+                    self.query_hops = action - pygame.K_0
+                elif action == pygame.K_c:
+                    self.show_components = not self.show_components
+
+        if (self.current_mode == 2 or self.current_mode == 4 or
+                self.current_mode == 5) and typed:
+            self.type_text(typed)
+
+        if self.current_mode in [0, 1, 6] and \
+                20 < pygame.time.get_ticks() - self.dir_delay:
+            if held[pygame.K_w]:
+                self.y_offset += 5
+                self.dir_delay = pygame.time.get_ticks()
+                self.mark_dirty()
+            elif held[pygame.K_s]:
+                self.y_offset -= 5
+                self.dir_delay = pygame.time.get_ticks()
+                self.mark_dirty()
+            if held[pygame.K_a]:
+                self.x_offset += 5
+                self.dir_delay = pygame.time.get_ticks()
+                self.mark_dirty()
+            elif held[pygame.K_d]:
+                self.x_offset -= 5
+                self.dir_delay = pygame.time.get_ticks()
+                self.mark_dirty()
+
+    def mode_0(self):
+        # Move and add points
+        check_select = True
+        if self.select_point is not None:
+            # Options follow the point on screen, which panning changes
+            self.update_option_pos()
+
+        # Only points in the grid cells around the mouse can be clicked on
+        hit_points = [each_point for each_point in self.nearby_points()
+                      if self.calculate_mouse(each_point)]
+        for each_point in hit_points:
+            if self.select_point is each_point and \
+                    self.mouse.collidelist(self.edit_options) < 0:
+                self.follow_mouse = True
+                check_select = False
+            else:
+                self.select_point = each_point
+                self.select_point.icon.display_options = True
+                check_select = False
+
+        # When not clicking on a point
+
+        if -1 < self.mouse.collidelist(self.edit_options) and \
+                self.select_point is not None and \
+                self.select_point.icon.display_options:
+            # Edit options when clicked
+            self.current_mode = self.mouse.collidelist(
+                self.edit_options) + 1
+            if self.current_mode == 2:
+                # Description layout is only built once it's opened
+                self.select_point.description.split_text(
+                    self.select_point.sel_page)
+
+        elif check_select:
+            # When not clicking on a point
+            check_dist = len(hit_points) < 1
+            if check_dist and self.select_point is None:
+                # Make a new point, only if it's far away from other points
+                # Only make a new point once we deselected our point
+                new_point = DataPoint()
+                map_x, map_y = self.screen_to_map(self.mouse.x, self.mouse.y)
+                new_point.change_icon_location(int(map_x), int(map_y))
+                new_point.change_id(self.id_count)
+                self.id_count += 1
+                self.add_datapoint(new_point)
+            elif -1 < self.mouse.collidelist(self.rect_colors) and \
+                    self.select_point is not None:
+                self.select_point.change_icon_color(
+                    self.color_options[self.mouse.collidelist(
+                        self.rect_colors)])
+                self.record_edit("color", self.select_point.id,
+                                 self.select_point.icon.color)
+                self.invalidate_point(self.select_point)
+            else:
+                # Deselect our point
+                self.select_point = None
+
+        elif self.select_point is not None:
+            self.update_option_pos()
+
+    def mode_1(self):
+        # On left click, find a valid point to click on that's not our point
+
+        # Change color of lines added
+        if -1 < self.mouse.collidelist(self.rect_colors):
+            self.line_col_ind = self.mouse.collidelist(self.rect_colors)
+        # Adding or removing a line on left click
+        elif 1 < len(self.datapoints):
+            find_point = None
+            for each_point in self.nearby_points():
+                if find_point is None and each_point is not self.select_point:
+                    find_point = self.calculate_mouse(each_point)
+
+            if find_point and self.edges.has(self.select_point.id,
+                                             find_point.id):
+                self.edges.remove(self.select_point.id, find_point.id)
+                self.record_edit("unedge", self.select_point.id, find_point.id)
+            elif find_point and self.edges.has(find_point.id,
+                                               self.select_point.id):
+                self.edges.remove(find_point.id, self.select_point.id)
+                self.record_edit("unedge", find_point.id, self.select_point.id)
+            elif find_point:
+                self.edges.add(self.select_point.id, find_point.id,
+                               self.color_options[self.line_col_ind])
+                self.record_edit("edge", self.select_point.id, find_point.id,
+                                 self.color_options[self.line_col_ind])
+            if find_point:
+                self.invalidate_point(find_point)
+            else:
+                self.select_point = None
+                self.show_select = False
+                self.current_mode = 0
+        else:
+            # No other points available, return to default mode
+            self.current_mode = 0
+            self.select_point = None
+            self.show_select = False
+
+    def mode_2(self):
+        # On left click, start typing where the click was
+        # Press left and right to move onto the next page
+        description = self.select_point.description
+        if not self.mouse.colliderect(self.desc_right) and \
+                not self.mouse.colliderect(self.desc_left) and \
+                not self.mouse.colliderect(self.confirm_rect):
+            description.move_cursor(self.select_point.sel_page,
+                                    description.cursor_at(self.mouse.x,
+                                                          self.mouse.y))
+        elif self.mouse.colliderect(self.desc_right):
+            if len(self.select_point.description.pages) - 1 <= self.select_point.sel_page:
+                self.select_point.description.add_page()
+            self.select_point.sel_page += 1
+            self.select_point.description.split_text(self.select_point.sel_page)
+        elif 0 < self.select_point.sel_page and self.mouse.colliderect(self.desc_left):
+            self.select_point.sel_page -= 1
+            self.select_point.description.split_text(self.select_point.sel_page)
+
+        # Left click special rect to leave typing interface
+        if self.mouse.colliderect(self.confirm_rect):
+            self.current_mode = 0
+            description.close_page()
+            self.record_edit("desc", self.select_point.id,
+                             list(description.pages))
+
+    def mode_3(self):
+        if self.mouse.colliderect(self.confirm_delete):
+            self.current_mode = 0
+            self.show_select = False
+            self.remove_datapoint(self.select_point)
+            self.select_point = None
+        elif self.mouse.colliderect(self.confirm_keep):
+            self.current_mode = 0
+
+    def mode_4(self):
+        if self.mouse.colliderect(self.confirm_title):
+            self.record_edit("title", self.select_point.id,
+                             self.select_point.title.text)
+            self.select_point.title.font_size = 12
+            self.select_point.title.setup()
+            self.select_point.title.render()
+            self.current_mode = 0
+            self.select_point = None
+            self.show_select = False
+
+    def mode_5(self):
+        # Clicking a result goes to it, clicking anywhere else stops searching
+        if -1 < self.mouse.collidelist(self.result_rects):
+            self.pick_result(self.mouse.collidelist(self.result_rects))
+        elif not self.mouse.colliderect(self.search_box):
+            self.current_mode = 0
+
+    def open_search(self):
+        if self.search_index is None:
+            self.search_index = SearchIndex()
+            for each_point in self.datapoints:
+                self.search_index.add_point(each_point)
+        self.select_point = None
+        self.show_select = False
+        self.current_mode = 5
+        self.search_text = ""
+        self.find_results()
+
+    def mode_6(self):
+        # First click picks where a path starts, the second where it ends
+        find_point = None
+        for each_point in self.nearby_points():
+            if find_point is None:
+                find_point = self.calculate_mouse(each_point)
+
+        if find_point is None:
+            self.query_start = None
+            self.query_end = None
+        elif self.query_start is None or self.query_end is not None:
+            self.query_start = find_point
+            self.query_end = None
+        else:
+            self.query_end = find_point
+
+    def start_layout(self):
+        # The layout is done with NumPy
+        if np is None or len(self.datapoints) < 2:
+            return None
+        self.layout = ForceLayout(self.datapoints, self.edges)
+
+    def apply_layout(self):
+        # Move every point to where the layout put its center
+        self.moving_many = True
+        for row, point_id in enumerate(self.layout.ids):
+            each_point = self.point_ids[point_id]
+            each_point.change_icon_location(
+                int(self.layout.positions[row, 0]) - each_point.icon.width // 2,
+                int(self.layout.positions[row, 1]) - each_point.icon.height // 2)
+        self.moving_many = False
+        self.point_grid.rebuild(self.datapoints)
+        self.line_grid.rebuild(self.edges)
+        self.static_layer.clear()
+        self.minimap.stale = True
+        # Too many moves to journal, the next autosave snapshots them
+        self.unjournaled = True
+
+    def open_query(self):
+        self.select_point = None
+        self.show_select = False
+        self.query_start = None
+        self.query_end = None
+        self.current_mode = 6
+
+    def find_results(self):
+        self.search_results = self.search_index.search(self.search_text, 10)
+        self.search_pick = 0
+
+    def pick_result(self, result_ind):
+        # Center the view on the point found and select it
+        found_point = self.point_ids[self.search_results[result_ind]]
+        self.jump_to(found_point.icon.center[0], found_point.icon.center[1])
+        self.select_point = found_point
+        self.select_point.icon.display_options = True
+        self.current_mode = 0
+
+    def type_text(self, typed):
+        """Put this frame's typed text into the description page, title or
+        search being typed in. Every run of characters goes in as one edit,
+        and every run of backspaces ("\b") as another
+        """
+        for each_run in re.findall("\b+|[^\b]+", typed):
+            if self.current_mode == 2:
+                description = self.select_point.description
+                if each_run[0] == "\b":
+                    description.erase_write(self.select_point.sel_page,
+                                            len(each_run))
+                else:
+                    self.select_point.sel_page = description.write_page(
+                        self.select_point.sel_page, each_run)
+            elif self.current_mode == 4:
+                if each_run[0] == "\b":
+                    self.select_point.erase_title(len(each_run))
+                else:
+                    self.select_point.change_title(each_run)
+            elif each_run[0] == "\b":
+                self.search_text = self.search_text[:-len(each_run)]
+            else:
+                self.search_text = (self.search_text + each_run)[:30]
+        if self.current_mode == 5:
+            self.find_results()
+        else:
+            # Journaled once it's confirmed, autosaves keep it until then
+            self.unsaved_ids.add(self.select_point.id)
+        self.mark_dirty()
+
+    def copy_text(self):
+        # Ctrl + c copies the page being typed in, or the title
+        if not pygame.scrap.get_init():
+            return None
+        if self.current_mode == 2:
+            text = self.select_point.description.saved_pages()[
+                self.select_point.sel_page]
+        else:
+            text = self.select_point.title.text
+        try:
+            pygame.scrap.put(pygame.SCRAP_TEXT, text.encode("utf-8"))
+        except pygame.error:
+            # No clipboard to copy to, like on headless displays
+            pass
+
+    def paste_text(self):
+        # Ctrl + v, the whole clipboard goes in as one edit
+        if not pygame.scrap.get_init():
+            return None
+        try:
+            pasted = pygame.scrap.get(pygame.SCRAP_TEXT)
+        except pygame.error:
+            pasted = None
+        if not pasted:
+            return None
+        # Pages and titles are one run of text, so line breaks and tabs
+        # become spaces
+        text = "".join(each_char if each_char.isprintable() else " "
+                       for each_char in pasted.decode("utf-8", "ignore")
+                       if each_char != "\x00")
+        if self.current_mode == 2:
+            self.select_point.sel_page = \
+                self.select_point.description.write_page(
+                    self.select_point.sel_page, text)
+        else:
+            self.select_point.change_title(text)
+        self.unsaved_ids.add(self.select_point.id)
+
+    def text_changed(self, each_point, field):
+        """Called by DataPoint when its title ("title") or a description
+        page (page number) changed, so only that text is indexed again
+        """
+        if self.search_index is None:
+            return None
+        if field == "title":
+            self.search_index.set_text(each_point.id, field,
+                                       each_point.title.text)
+        else:
+            self.search_index.set_text(each_point.id, field,
+                                       each_point.description.pages[field])
+
+    def update(self):
+        if self.select_point is not None and \
+                not self.select_point.icon.display_options:
+            self.select_point = None
+            self.mark_dirty()
+
+        if self.follow_mouse and self.select_point is not None:
+            # Only where the point was and where it is now gets redrawn
+            for dirty_rect in self.point_screen_rects(self.select_point):
+                self.mark_dirty(dirty_rect)
+            map_x, map_y = self.screen_to_map(self.mouse.x, self.mouse.y)
+            self.select_point.change_icon_location(int(map_x), int(map_y))
+            self.update_option_pos()
+            for dirty_rect in self.point_screen_rects(self.select_point):
+                self.mark_dirty(dirty_rect)
+
+        if self.current_mode == 2 and \
+                self.select_point.description.update_blink():
+            self.mark_dirty(self.select_point.description.cursor_rect)
+
+        if self.layout is not None:
+            if self.layout.edges_version != self.edges.version or \
+                    len(self.layout.ids) != len(self.datapoints):
+                # Points or lines changed, the layout no longer fits the map
+                self.layout = None
+            elif self.layout.run(self.layout_budget):
+                self.apply_layout()
+                self.layout = None
+                self.mark_dirty()
+            self.mark_dirty(self.layout_rect)
+
+        if self.autosave_delay < pygame.time.get_ticks() - self.autosave_timer:
+            self.autosave()
+        if 0 < len(self.snapshot_caches) and \
+                self.cache_snapshot <= self.journal.snapshots_written:
+            for code_cache in self.snapshot_caches:
+                self.save_code_cache(code_cache)
+            self.snapshot_caches = []
+
+    def idle_timeout(self):
+        if self.follow_mouse or self.redraw_all or \
+                0 < len(self.dirty_rects) or self.layout is not None:
+            return 0
+
+        # Held keys pan or repeat characters every frame
+        held = pygame.key.get_pressed()
+        if self.current_mode in [0, 1, 6] and \
+                (held[pygame.K_w] or held[pygame.K_a] or
+                 held[pygame.K_s] or held[pygame.K_d]):
+            return 0
+
+        # Otherwise only wake up for the next timed change
+        wake_times = []
+        if self.needs_autosave():
+            wake_times += [self.autosave_delay -
+                           (pygame.time.get_ticks() - self.autosave_timer)]
+        if self.current_mode == 2:
+            wake_times += [self.select_point.description.next_blink()]
+        if len(wake_times) < 1:
+            return None
+        return max(1, min(wake_times))
+
+    def render(self, screen):
+        if not self.redraw_all and 0 < len(self.dirty_rects):
+            # Leave everything outside of the changed areas alone
+            screen.set_clip(self.dirty_rects[0].unionall(self.dirty_rects[1:]))
+        screen.fill(WHITE)
+        self.render_modes[self.current_mode](screen)  # type: ignore
+        screen.set_clip(None)
+
+    def render_mode_0(self, screen):
+        # Default rendering mode
+
+        # Anything outside of the window (or the area being redrawn) after
+        # panning is skipped
+        viewport = screen.get_clip()
+
+        # Points in mode 1 are drawn differently, so they get other tiles
+        self.static_layer.set_style(self.current_mode == 1, self.zoom)
+        if self.layer_selected is not self.select_point:
+            # Tiles leave the selected point out, it gets drawn on top
+            for each_point in [self.layer_selected, self.select_point]:
+                if each_point is not None and each_point.owner is self:
+                    self.invalidate_point(each_point)
+            self.layer_selected = self.select_point
+
+        # Everything that isn't selected comes from cached tiles
+        self.static_layer.render(screen, self, viewport)
+
+        # Render the selected point with its lines over the tiles
+        if self.select_point is not None:
+            self.select_point.render_lines(screen,
+                                           self.line_ends(self.select_point),
+                                           self.x_offset, self.y_offset,
+                                           viewport, self.zoom)
+            for from_id in self.edges.lines_to(self.select_point.id):
+                self.point_ids[from_id].render_lines(
+                    screen, [(self.select_point,
+                              self.edges.lines_from(from_id)[
+                                  self.select_point.id])],
+                    self.x_offset, self.y_offset, viewport, self.zoom)
+            self.render_point(screen, self.select_point, self.x_offset,
+                              self.y_offset, viewport)
+
+        # Render options
+        if self.select_point and \
+                self.select_point.icon.display_options:
+            self.update_option_pos()
+            for op_ind in range(len(self.edit_options)):
+                pygame.draw.rect(screen, ORANGE, self.edit_options[op_ind], 1)
+                if self.option_imgs[op_ind] is not None:
+                    screen.blit(self.option_imgs[op_ind],
+                                self.edit_options[op_ind])
+
+                # Render the options images on top
+
+        # Render color options
+        if self.select_point:
+            for color in self.rect_colors:
+                color.render(screen)
+
+        if 0 < len(self.datapoints):
+            self.minimap.render(screen, self)
+
+        if self.layout is not None:
+            layout_img = TEXT_SURFACES.render(
+                "Laying out map " + str(self.layout.iteration) + " / " +
+                str(self.layout.iterations), "impact", 20, BLACK)
+            pygame.draw.rect(screen, WHITE, self.layout_rect)
+            screen.blit(layout_img, (self.layout_rect.x,
+                                     self.layout_rect.y + 3))
+
+    def render_point(self, screen, each_point, x_offset, y_offset, viewport):
+        if self.current_mode == 1 and each_point is not self.select_point:
+            # Turn points to rects to show that it's clickable
+            each_point.change_icon_border(0)
+        else:
+            # Circle default rendering with title/text above them
+            each_point.change_icon_border(100)
+        # Titles too small to read once zoomed out are left out
+        if (self.current_mode != 1 or each_point is self.select_point) and \
+                self.min_title_size <= \
+                each_point.title.font_size * self.zoom:
+            each_point.title.prepare()
+            title_rect = pygame.Rect(
+                each_point.icon.center[0] * self.zoom - (each_point.title.text_rect.width / 2) + x_offset,
+                each_point.icon.center[1] * self.zoom - (each_point.title.text_rect.height) + y_offset,
+                each_point.title.text_rect.width,
+                each_point.title.text_rect.height)
+            if viewport.colliderect(title_rect):
+                screen.blit(each_point.title.text_img, title_rect)
+        each_point.render(screen, x_offset, y_offset, self.zoom)
+
+    def render_mode_1(self, screen):
+        pygame.draw.rect(screen, LIME_GREEN, self.confirm_rect)
+        self.select_point.description.render_page(screen, self.select_point.sel_page)
+        pygame.draw.rect(screen, YELLOW, self.desc_right)
+        pygame.draw.rect(screen, YELLOW, self.desc_left)
+
+    def render_mode_2(self, screen):
+        self.select_point.render(screen, 0, 0)
+        pygame.draw.rect(screen, DARK_RED, self.confirm_keep)
+        pygame.draw.rect(screen, DARK_GREEN, self.confirm_delete)
+        screen.blit(self.delete_text.text_img, self.delete_text.text_rect)
+
+    def render_mode_3(self, screen):
+        # Titles too small to show when zoomed out were never rendered
+        self.select_point.title.prepare()
+        screen.blit(self.select_point.title.text_img,
+                    self.select_point.title.text_rect)
+        pygame.draw.rect(screen, LIME_GREEN, self.confirm_title)
+
+    def render_mode_4(self, screen):
+        # Search box and its results over the map
+        self.render_mode_0(screen)
+        pygame.draw.rect(screen, WHITE, self.search_box)
+        pygame.draw.rect(screen, DARK_GREY, self.search_box, 2)
+        search_img = TEXT_SURFACES.render("Search: " + self.search_text,
+                                          "impact", 24, BLACK)
+        screen.blit(search_img, (self.search_box.x + 10,
+                                 self.search_box.y + 5))
+
+        self.result_rects = []
+        for result_ind, point_id in enumerate(self.search_results):
+            result_rect = pygame.Rect(self.search_box.x,
+                                      self.search_box.bottom + 30 * result_ind,
+                                      self.search_box.width, 30)
+            if result_ind == self.search_pick:
+                pygame.draw.rect(screen, YELLOW, result_rect)
+            else:
+                pygame.draw.rect(screen, WHITE, result_rect)
+            pygame.draw.rect(screen, GREY, result_rect, 1)
+            result_title = self.point_ids[point_id].title.text
+            if len(result_title) < 1:
+                result_title = "Untitled point " + str(point_id)
+            result_img = TEXT_SURFACES.render(result_title, "impact", 20,
+                                              BLACK)
+            screen.blit(result_img, (result_rect.x + 10, result_rect.y + 3))
+            self.result_rects += [result_rect]
+
+    def render_mode_5(self, screen):
+        # Graph query results drawn over the map
+        self.render_mode_0(screen)
+        viewport = screen.get_clip()
+
+        if self.show_components:
+            # Every group of connected points gets its own ring color
+            component_of = self.graph.components()
+            for each_point in self.visible_points(viewport):
+                if each_point.id in component_of:
+                    self.render_ring(screen, each_point, self.color_options[
+                        component_of[each_point.id] %
+                        len(self.color_options)])
+
+        status = "Click two points for a path, 0-9 for neighbors, " \
+                 "c for components"
+        if self.query_start is not None and self.query_start.owner is self:
+            if 0 < self.query_hops:
+                near_points = self.graph.neighborhood(self.query_start.id,
+                                                      self.query_hops)
+                for point_id in near_points:
+                    self.render_ring(screen, self.point_ids[point_id], BLUE)
+                status = str(len(near_points) - 1) + " points within " + \
+                    str(self.query_hops) + " hops"
+
+            if self.query_end is not None and self.query_end.owner is self:
+                path = self.graph.shortest_path(self.query_start.id,
+                                                self.query_end.id)
+                for from_id, to_id in zip(path, path[1:]):
+                    start = self.map_to_screen(
+                        self.point_ids[from_id].icon.center[0],
+                        self.point_ids[from_id].icon.center[1])
+                    end = self.map_to_screen(
+                        self.point_ids[to_id].icon.center[0],
+                        self.point_ids[to_id].icon.center[1])
+                    clipped = viewport.clipline(start, end)
+                    if clipped:
+                        pygame.draw.line(screen, ORANGE, clipped[0],
+                                         clipped[1], 4)
+                for point_id in path:
+                    self.render_ring(screen, self.point_ids[point_id], ORANGE)
+                if 0 < len(path):
+                    status = "Shortest path: " + str(len(path) - 1) + " hops"
+                else:
+                    status = "No path between these points"
+            self.render_ring(screen, self.query_start, ORANGE)
+
+        status_img = TEXT_SURFACES.render(status, "impact", 20, BLACK)
+        screen.blit(status_img, (self.memory.res_width / 2 -
+                                 status_img.get_width() / 2, 10))
+
+    def render_ring(self, screen, each_point, ring_color):
+        center = self.map_to_screen(each_point.icon.center[0],
+                                    each_point.icon.center[1])
+        pygame.draw.circle(screen, ring_color, center, 8, 2)
+
+    def calculate_mouse(self, point_b):
+        """Point a is self.mouse
+        Point b is any datapoint
+        """
+        hitbox_mod = 3  # Radius size, change for more/less cluttering
+
+        # Compare squared distances so no square root is needed. The reach
+        # is kept in screen pixels so points stay clickable zoomed out
+        reach = (point_b.icon.width * hitbox_mod) ** 2
+        center_x, center_y = self.map_to_screen(point_b.icon.center[0],
+                                                point_b.icon.center[1])
+        left = self.mouse.x - center_x
+        top = self.mouse.y - center_y
+        right = left + self.mouse.width
+        bottom = top + self.mouse.height
+
+        # Top left, top right, bottom left then bottom right corner
+        for corner_x, corner_y in ((left, top), (right, top),
+                                   (left, bottom), (right, bottom)):
+            if corner_x ** 2 + corner_y ** 2 <= reach:
+                return point_b
+
+        # No points detected
+        return None
+
+    def nearby_points(self):
+        """Return the datapoints in grid cells close to the mouse, the only
+        ones calculate_mouse could detect
+        """
+        map_x, map_y = self.screen_to_map(self.mouse.x, self.mouse.y)
+        return self.point_grid.query(map_x, map_y,
+                                     self.hit_radius / self.zoom)
+
+    def visible_points(self, viewport):
+        """Return the datapoints in grid cells overlapping the viewport,
+        widened by map_margin so titles hanging into view are kept
+        """
+        min_x, min_y = self.screen_to_map(viewport.left, viewport.top)
+        max_x, max_y = self.screen_to_map(viewport.right, viewport.bottom)
+        return self.point_grid.query_area(
+            min_x - self.map_margin(), min_y - self.map_margin(),
+            max_x + self.map_margin(), max_y + self.map_margin())
+
+    def screen_to_map(self, x, y):
+        return (x - self.x_offset) / self.zoom, (y - self.y_offset) / self.zoom
+
+    def map_to_screen(self, x, y):
+        return x * self.zoom + self.x_offset, y * self.zoom + self.y_offset
+
+    def zoom_at(self, x, y, zoom_levels):
+        """Zoom in (positive zoom_levels) or out around the screen position
+        x and y, which stays over the same spot on the map
+        """
+        map_x, map_y = self.screen_to_map(x, y)
+        self.zoom_level = min(self.max_zoom_level,
+                              max(self.min_zoom_level,
+                                  self.zoom_level + zoom_levels))
+        self.zoom = self.zoom_step ** self.zoom_level
+        # Offsets stay whole pixels so tiles line up with the screen
+        self.x_offset = round(x - map_x * self.zoom)
+        self.y_offset = round(y - map_y * self.zoom)
+
+    def jump_to(self, x, y):
+        # Center the view on the map position x and y
+        self.x_offset = round(self.memory.res_width / 2 - x * self.zoom)
+        self.y_offset = round(self.memory.res_height / 2 - y * self.zoom)
+
+    def map_margin(self):
+        # How far around a point's center its title or icon can reach
+        if self.zoom * 12 < self.min_title_size:
+            # Default titles are hidden, only the icon is left
+            return 8 / self.zoom
+        return self.view_margin / self.zoom
+
+    def cluster_level(self):
+        """Return the point_grid cluster level drawn instead of single points
+        at the current zoom, or 0 when every point is drawn
+        """
+        if self.cluster_zoom <= self.zoom:
+            return 0
+        level = 1
+        while level < len(self.point_grid.clusters) and \
+                (self.point_grid.cell_size << level) * self.zoom < \
+                self.cluster_size:
+            level += 1
+        return level
+
+    def line_ends(self, from_point):
+        # Points and colors of every line drawn from from_point
+        return [(self.point_ids[to_id], line_color) for to_id, line_color in
+                self.edges.lines_from(from_point.id).items()]
+
+    def add_datapoint(self, new_point):
+        new_point.owner = self
+        new_point.description.owner = new_point
+        if self.search_index is not None:
+            self.search_index.add_point(new_point)
+        self.point_ids[new_point.id] = new_point
+        self.point_rows[new_point.id] = len(self.datapoints)
+        self.datapoints += [new_point]
+        self.point_grid.insert(new_point)
+        self.minimap.add(new_point.icon.center)
+        self.invalidate_point(new_point)
+        self.record_edit("add", new_point.id, new_point.icon.color,
+                         new_point.icon.rect.x, new_point.icon.rect.y,
+                         new_point.icon.width, new_point.icon.height)
+
+    def import_code(self, source_path, workers=None):
+        """Add a point for every module, class and function under
+        source_path, with lines for what they contain, import and call.
+
+        Importing the same tree again only parses the files that changed
+        since, then patches their points and lines. Points keep where they
+        were moved to and the color they were given
+        """
+        code_cache = self.load_code_cache(source_path)
+        symbols, gone_keys, new_links, old_links = code_cache.refresh(workers)
+        key_ids = code_cache.key_ids
+        # Symbols whose points were deleted on the map get new points if
+        # their file changes, until then their lines are left out
+        deleted_keys = [key for key, point_id in key_ids.items()
+                        if point_id not in self.point_ids]
+        for key in deleted_keys:
+            del key_ids[key]
+        if 0 < len(deleted_keys):
+            code_cache.unsaved = True
+        if len(symbols) + len(gone_keys) + len(new_links) + \
+                len(old_links) < 1:
+            return key_ids
+        # Small refreshes are journaled edit by edit, big ones are saved
+        # with one snapshot and redraw every tile once
+        journaled = len(symbols) + len(gone_keys) < self.journal_limit
+        self.moving_many = not journaled
+
+        for from_key, to_key, kind in old_links:
+            from_id = key_ids.get(from_key)
+            to_id = key_ids.get(to_key)
+            if self.edges.has(from_id, to_id):
+                if journaled:
+                    self.invalidate_point(self.point_ids[from_id])
+                    self.record_edit("unedge", from_id, to_id)
+                self.unsaved_ids.add(from_id)
+                self.edges.remove(from_id, to_id)
+
+        for key in gone_keys:
+            old_point = self.point_ids.get(key_ids.pop(key, None))
+            if old_point is not None:
+                if old_point is self.select_point:
+                    self.select_point = None
+                self.remove_datapoint(old_point)
+
+        made = self.place_symbols(symbols, key_ids, journaled)
+
+        link_colors = {"contains": GREY, "imports": BLUE, "calls": ORANGE}
+        for from_key, to_key, kind in new_links:
+            from_id = key_ids.get(from_key)
+            to_id = key_ids.get(to_key)
+            if from_id not in self.point_ids or to_id not in self.point_ids:
+                continue
+            self.edges.add(from_id, to_id, link_colors[kind])
+            self.unsaved_ids.add(from_id)
+            if journaled:
+                self.invalidate_point(self.point_ids[from_id])
+                self.record_edit("edge", from_id, to_id, link_colors[kind])
+
+        self.moving_many = False
+        if not journaled:
+            self.static_layer.clear()
+            self.minimap.stale = True
+            # Left for the next autosave to snapshot, the cache can't name
+            # its points before they're on disk
+            self.unjournaled = True
+            if code_cache not in self.unsnapshotted_caches:
+                self.unsnapshotted_caches += [code_cache]
+        elif (0 < len(gone_keys) or 0 < made) and code_cache not in \
+                self.unsnapshotted_caches + self.snapshot_caches:
+            # Which point each symbol has must survive a crash, files that
+            # only changed wait for save_map as they'd just be parsed again.
+            # Caches already waiting for a snapshot are saved with it
+            self.save_code_cache(code_cache)
+        self.mark_dirty()
+        return key_ids
+
+    def place_symbols(self, symbols, key_ids, journaled):
+        """Make or update the point of every symbol and return how many
+        were made. New modules are laid out right of the map with their
+        members in rows under them, new members of modules already on the
+        map go in rows above them
+        """
+        kind_colors = {"module": PURPLE, "class": BLUE,
+                       "function": LIME_GREEN}
+        page_size = 12 * Description().char_per_line
+        spacing = 60
+        per_row = 8
+        block_width = spacing * (per_row + 1)
+
+        start_x = None  # Found once the first new module needs it
+        blocks_per_row = max(1, int(len(symbols) ** 0.5 / per_row))
+        block_x = 0
+        block_y = 0
+        row_height = 0
+        blocks = 0
+        member = 0
+        made = 0
+        module_point = None
+
+        for symbol in symbols:
+            title = symbol["title"][-30:]
+            text = symbol["kind"] + " " + symbol["title"] + " in " + \
+                symbol["path"] + ":" + str(symbol["line"]) + ". " + \
+                " ".join(symbol["doc"].split())
+            pages = [text[page:page + page_size]
+                     for page in range(0, len(text), page_size)]
+
+            old_point = self.point_ids.get(key_ids.get(symbol["key"]))
+            if symbol["kind"] == "module":
+                member = 0
+                module_point = old_point
+            if old_point is not None:
+                self.update_symbol(old_point, title, pages, journaled)
+                continue
+
+            if module_point is not None:
+                # Above a module that was already on the map
+                x = module_point.icon.rect.x + spacing * (member % per_row)
+                y = module_point.icon.rect.y - spacing * (member // per_row + 1)
+                member += 1
+            elif symbol["kind"] == "module":
+                if start_x is None:
+                    start_x = 0
+                    if 0 < len(self.datapoints):
+                        start_x = block_width + max(
+                            each_point.icon.rect.right
+                            for each_point in self.datapoints)
+                    block_x = start_x
+                elif 0 < blocks:
+                    row_height = max(row_height,
+                                     spacing * (member // per_row + 2))
+                    block_x += block_width
+                    if blocks % blocks_per_row == 0:
+                        block_x = start_x
+                        block_y += row_height + spacing
+                        row_height = 0
+                blocks += 1
+                x, y = block_x, block_y
+            else:
+                x = block_x + spacing * (member % per_row)
+                y = block_y + spacing * (member // per_row + 1)
+                member += 1
+
+            new_point = DataPoint(12, True)
+            new_point.title.text = title
+            new_point.change_icon_location(x, y)
+            new_point.change_icon_color(kind_colors[symbol["kind"]])
+            new_point.change_id(self.id_count)
+            self.id_count += 1
+            new_point.description.pages = pages
+            key_ids[symbol["key"]] = new_point.id
+            made += 1
+            if journaled:
+                self.add_datapoint(new_point)
+                self.record_edit("title", new_point.id, title)
+                self.record_edit("desc", new_point.id, list(pages))
+                continue
+
+            new_point.owner = self
+            new_point.description.owner = new_point
+            self.point_ids[new_point.id] = new_point
+            self.point_rows[new_point.id] = len(self.datapoints)
+            self.datapoints += [new_point]
+            self.point_grid.insert(new_point)
+            self.unsaved_ids.add(new_point.id)
+            if self.search_index is not None:
+                self.search_index.add_point(new_point)
+        return made
+
+    def update_symbol(self, each_point, title, pages, journaled):
+        # Only the text of an imported point follows its source
+        each_point.description.close_page()
+        if each_point.title.text != title:
+            each_point.title.text = title
+            if each_point.title.text_img is not None:
+                each_point.title.render()
+            self.text_changed(each_point, "title")
+            self.unsaved_ids.add(each_point.id)
+            if journaled:
+                self.record_edit("title", each_point.id, title)
+        if each_point.description.pages != pages:
+            if self.search_index is not None:
+                self.search_index.remove_point(each_point.id)
+            each_point.description.pages = pages
+            each_point.sel_page = 0
+            if self.search_index is not None:
+                self.search_index.add_point(each_point)
+            self.unsaved_ids.add(each_point.id)
+            if journaled:
+                self.record_edit("desc", each_point.id, list(pages))
+        if journaled:
+            self.invalidate_point(each_point)
+
+    def load_code_cache(self, source_path):
+        # What was parsed from source_path, kept in memory once loaded
+        source_path = os.path.abspath(source_path)
+        if source_path not in self.code_caches:
+            code_cache = None
+            cache_path = self.code_cache_path(source_path)
+            if cache_path is not None and os.path.exists(cache_path):
+                try:
+                    code_cache = code_importer.ImportCache.load(cache_path)
+                except Exception:
+                    # Parse everything again rather than trust a bad cache
+                    code_cache = None
+                if not isinstance(code_cache, code_importer.ImportCache):
+                    code_cache = None
+            if code_cache is None:
+                code_cache = code_importer.ImportCache(source_path)
+            self.code_caches[source_path] = code_cache
+        return self.code_caches[source_path]
+
+    def save_code_cache(self, code_cache):
+        # Caches sit next to the map they were imported into
+        if self.journal is None:
+            return None
+        code_cache.save(self.code_cache_path(code_cache.source_path))
+
+    def code_cache_path(self, source_path):
+        if self.journal is None:
+            return None
+        return self.journal.save_path + "/code_" + hashlib.sha1(
+            source_path.encode()).hexdigest()[:12] + ".cache"
+
+    def remove_datapoint(self, old_point):
+        self.invalidate_point(old_point)
+        # Lines to and from the point go too, so none are left dangling.
+        # The line grid still needs the point's center to find them
+        self.unsaved_ids.update(self.edges.lines_to(old_point.id))
+        self.edges.remove_point(old_point.id)
+        # The last point takes its place instead of shifting every point
+        row = self.point_rows.pop(old_point.id)
+        last_point = self.datapoints.pop()
+        if last_point is not old_point:
+            self.datapoints[row] = last_point
+            self.point_rows[last_point.id] = row
+        del self.point_ids[old_point.id]
+        self.point_grid.remove(old_point)
+        self.minimap.remove(old_point.icon.center)
+        if self.search_index is not None:
+            self.search_index.remove_point(old_point.id)
+        if old_point is self.query_start or old_point is self.query_end:
+            self.query_start = None
+            self.query_end = None
+        old_point.owner = None
+        self.record_edit("delete", old_point.id)
+
+    def record_edit(self, *record):
+        # Maps run without a save folder have nowhere to journal to
+        self.unsaved_ids.add(record[1])
+        if self.journal is not None:
+            self.journal.record(*record)
+
+    def point_moved(self, moved_point, old_center):
+        # Called by DataPoint.change_icon_location to keep the grid current
+        self.moved_ids.add(moved_point.id)
+        if self.moving_many:
+            return None
+        self.point_grid.move(moved_point)
+        self.line_grid.move_point(moved_point.id, old_center, self.edges)
+        if self.minimap.move(old_center, moved_point.icon.center):
+            self.mark_dirty(self.minimap.panel)
+        if moved_point is not self.layer_selected:
+            self.invalidate_point(moved_point, old_center)
+            self.invalidate_point(moved_point)
+
+    def point_screen_rects(self, each_point):
+        """Return the screen areas covered by a point's title, icon, edit
+        options and lines
+        """
+        center_x, center_y = self.map_to_screen(each_point.icon.center[0],
+                                                each_point.icon.center[1])
+        screen_rects = [pygame.Rect(center_x - self.view_margin, center_y - 40,
+                                    self.view_margin * 2, 50)]
+
+        for other_id in list(self.edges.lines_from(each_point.id)) + \
+                list(self.edges.lines_to(each_point.id)):
+            other_x, other_y = self.map_to_screen(
+                self.point_ids[other_id].icon.center[0],
+                self.point_ids[other_id].icon.center[1])
+            screen_rects += [pygame.Rect(min(center_x, other_x),
+                                         min(center_y, other_y),
+                                         abs(center_x - other_x),
+                                         abs(center_y - other_y)).inflate(6, 6)]
+        return screen_rects
+
+    def invalidate_point(self, each_point, center=None):
+        """Throw away cached tiles under a point's title, icon and lines,
+        at center if given or where the point is now
+        """
+        if center is None:
+            center = each_point.icon.center
+        margin = self.map_margin()
+        self.static_layer.invalidate(pygame.Rect(
+            center[0] - margin, center[1] - margin, margin * 2, margin * 2))
+
+        for other_id in list(self.edges.lines_from(each_point.id)) + \
+                list(self.edges.lines_to(each_point.id)):
+            self.static_layer.invalidate_line(
+                center, self.point_ids[other_id].icon.center,
+                int(6 / self.zoom))
+
+    def calculate_distance(self, point_a, point_b):
+        """Get distance between point_a and point_b and return point_b
+        if point_a is touching
+        """
+        hitbox_mod = 3  # Radius size, change for more/less cluttering
+
+        if math.sqrt((point_a.icon.center[0] - point_b.icon.center[0]) ** 2 +
+                     (point_a.icon.center[1] -
+                      point_b.icon.center[1]) ** 2) <= \
+                point_b.icon.width * hitbox_mod:
+            return point_b
+        else:
+            # No points detected
+            return None
+
+    def update_option_pos(self):
+        size = 20  # How big each icon should be
+        offset = 10  # How far each icon is from the point
+        # Options are kept on the screen, next to where the point is shown
+        center_x, center_y = self.map_to_screen(
+            self.select_point.icon.center[0], self.select_point.icon.center[1])
+        for option_ind in range(len(self.edit_options)):
+            self.edit_options[option_ind].x = \
+                center_x + (size * option_ind) + offset
+            self.edit_options[option_ind].y = center_y - size - offset
+            self.edit_options[option_ind].width = size
+            self.edit_options[option_ind].height = size
+
+    def needs_autosave(self):
+        # Whether anything changed since my_map was last brought up to date
+        return self.journal is not None and \
+            (0 < self.journal.record_count or self.unjournaled or
+             0 < len(self.unsaved_ids))
+
+    def autosave(self):
+        # Copying the map is quick, pickling and writing it happens on the
+        # journal's worker thread so frames keep coming
+        self.autosave_timer = pygame.time.get_ticks()
+        if not self.needs_autosave() or self.journal.is_busy():
+            return None
+
+        self.unjournaled = False
+        # Left alone while the worker writes it, it's only updated here
+        if self.saved_copy is None:
+            self.saved_copy = MemoryPoint()
+            self.saved_copy.comp_dp(self.datapoints, self.edges)
+        else:
+            self.saved_copy.update_dp(self.point_ids, self.unsaved_ids,
+                                      self.moved_ids, self.edges)
+        self.unsaved_ids = set()
+        self.moved_ids = set()
+        self.journal.save_snapshot(self.saved_copy)
+        if 0 < len(self.unsnapshotted_caches):
+            self.snapshot_caches += self.unsnapshotted_caches
+            self.unsnapshotted_caches = []
+            self.cache_snapshot = self.journal.snapshots_written + 1
+
+    def save_map(self):
+        out_path = os.getcwd()
+        if "save" not in os.listdir(out_path):
+            # Debug here for no save folder
+            return None
+
+        if len(os.listdir(out_path + "/save")) < 1:
+            # Debug here for no map in folder, or just a warning
+            pass
+
+        # todo: Update the map to have a map selector in the future
+
+        # Text typed into the selected point without confirming it is kept
+        if self.select_point is not None:
+            self.select_point.description.close_page()
+            self.record_edit("desc", self.select_point.id,
+                             list(self.select_point.description.pages))
+            self.record_edit("title", self.select_point.id,
+                             self.select_point.title.text)
+
+        # Every edit is already journaled, only changes made without
+        # journaling them need a snapshot first
+        if self.journal is not None:
+            if self.unjournaled:
+                self.journal.wait()
+                self.autosave()
+            self.journal.close()
+        for code_cache in self.code_caches.values():
+            if code_cache.unsaved:
+                self.save_code_cache(code_cache)
+
+
+class DataPoint:
+    def __init__(self, title_size=24, lazy_title=False):
+        self.title = Text("", [1280 / 2, 720 / 2], title_size, "impact",
+                          BLACK, None, lazy_title)
+        self.description = Description()
+        self.icon = Icon(LIME_GREEN, [0, 0], 5, 5)
+        self.id = 0
+        self.sel_page = 0
+        self.owner = None   # Scene notified when this point moves
+
+    def change_title(self, text):
+        # Typed or pasted text fills the title up to 30 characters
+        self.title.text = (self.title.text + text)[:30]
+        self.title_changed()
+
+    def erase_title(self, count=1):
+        self.title.text = self.title.text[:max(0, len(self.title.text) -
+                                               count)]
+        self.title_changed()
+
+    def title_changed(self):
+        self.title.render()
+        if self.owner is not None:
+            self.owner.text_changed(self, "title")
+
+    def page_changed(self, page_num):
+        # Called by self.description once it's done typing into a page
+        if self.owner is not None:
+            self.owner.text_changed(self, page_num)
+
+    def change_description(self, in_desc):
+        self.description = [""]
+        desc_len = len(in_desc)
+        max_char = 50  # How many characters per line
+        for each_line in range(0, desc_len, max_char):
+            self.description += [each_line]
+
+    def change_icon_color(self, new_color):
+        self.icon.color = new_color
+
+    def change_icon_location(self, x, y):
+        old_center = self.icon.center
+        self.icon.rect.x = x
+        self.icon.rect.y = y
+        self.icon.shadow_rect.x = x + self.icon.width // 3
+        self.icon.shadow_rect.y = y + self.icon.height // 3
+        self.icon.center = self.icon.rect.center
+        if self.owner is not None:
+            self.owner.point_moved(self, old_center)
+
+    def change_icon_radius(self, new_radius):
+        self.icon.radius = new_radius
+
+    def change_icon_border(self, new_border):
+        # Also known as "change_icon_edges"
+        self.icon.border = new_border
+
+    def change_id(self, new_id):
+        self.id = new_id
+
+    def update(self):
+        pass
+
+    def render(self, screen, x_offset, y_offset, zoom=1.0):
+        self.icon.render(screen, x_offset, y_offset, zoom)
+
+    def render_lines(self, screen, line_ends, x_offset, y_offset,
+                     viewport=None, zoom=1.0):
+        # line_ends holds (other point, line color) for each line to draw
+        for other_point, line_color in line_ends:
+            start = (self.icon.center[0] * zoom + x_offset,
+                     self.icon.center[1] * zoom + y_offset)
+            end = (other_point.icon.center[0] * zoom + x_offset,
+                   other_point.icon.center[1] * zoom + y_offset)
+            if viewport is not None:
+                # Only draw the part of the line inside the viewport
+                clipped = viewport.clipline(start, end)
+                if not clipped:
+                    continue
+                start, end = clipped
+
+            if zoom < 1:
+                # Zoomed out lines are thin and leave out their shadow
+                pygame.draw.line(screen, line_color, start, end, 1)
+                continue
+
+            # Line Shadow
+            pygame.draw.line(screen, DARK_GREY,
+                             (start[0] + 1, start[1] + 1),
+                             (end[0] + 1, end[1] + 1), 2)
+
+            # Actual Line
+            pygame.draw.line(screen, line_color, start, end, 2)
+
+
+class GapBuffer:
+    """
+    Class used to hold the text of the page being typed in. The unused
+    room sits at the cursor, so typing or erasing there never copies the
+    rest of the page, only moving the cursor shifts characters across
+    """
+
+    def __init__(self, text=""):
+        self.chars = list(text) + [""] * 16
+        self.gap_start = len(text)  # Also where the cursor is
+        self.gap_end = len(self.chars)
+
+    def __len__(self):
+        return len(self.chars) - (self.gap_end - self.gap_start)
+
+    def move_gap(self, index):
+        if index < self.gap_start:
+            count = self.gap_start - index
+            self.chars[self.gap_end - count:self.gap_end] = \
+                self.chars[index:self.gap_start]
+            self.gap_start -= count
+            self.gap_end -= count
+        elif self.gap_start < index:
+            count = index - self.gap_start
+            self.chars[self.gap_start:index] = \
+                self.chars[self.gap_end:self.gap_end + count]
+            self.gap_start += count
+            self.gap_end += count
+
+    def insert(self, text):
+        if self.gap_end - self.gap_start < len(text):
+            # Double the room so inserting stays cheap on average
+            grow = max(len(text), len(self.chars))
+            self.chars[self.gap_end:self.gap_end] = [""] * grow
+            self.gap_end += grow
+        self.chars[self.gap_start:self.gap_start + len(text)] = list(text)
+        self.gap_start += len(text)
+
+    def erase(self, count=1):
+        # Remove characters before the cursor, returns how many were
+        erased = min(count, self.gap_start)
+        self.gap_start -= erased
+        return erased
+
+    def slice(self, start, end):
+        gap = self.gap_end - self.gap_start
+        if end <= self.gap_start:
+            return "".join(self.chars[start:end])
+        if self.gap_start <= start:
+            return "".join(self.chars[start + gap:end + gap])
+        return "".join(self.chars[start:self.gap_start]) + \
+            "".join(self.chars[self.gap_end:end + gap])
+
+    def text(self):
+        return self.slice(0, len(self))
+
+
+class Description:
+    def __init__(self):
+        self.pages = [""]
+        self.char_per_line = 40
+        self.font_size = 40
+        self.blink_timer = 0
+        self.current_page = []
+        self.line_starts = [0]  # Index in the page where each line begins
+        self.wrapped_page = None    # Page that current_page was wrapped from
+        self.buffer = None  # GapBuffer of the page being typed in
+        self.buffer_page = None
+        self.cursor_shown = False   # Typing bar blinks on and off
+        self.cursor_rect = pygame.Rect(10, 5, self.font_size / 8,
+                                       self.font_size)
+        self.owner = None   # DataPoint told when a page changes
+
+    def __getstate__(self):
+        # The owner links back to the whole map, which isn't saved here
+        state = self.__dict__.copy()
+        state["owner"] = None
+        state["pages"] = self.saved_pages()
+        state.pop("stored_pages", None)
+        state["buffer"] = None
+        state["buffer_page"] = None
+        state["wrapped_page"] = None
+        return state
+
+    def __setstate__(self, state):
+        # Descriptions pickled before newer attributes existed still load
+        self.__init__()
+        self.__dict__.update(state)
+
+    def __getattr__(self, name):
+        # Only called for missing attributes, pages left by load_later
+        if name == "pages" and "stored_pages" in self.__dict__:
+            self.pages = self.__dict__.pop("stored_pages").load()
+            return self.pages
+        raise AttributeError(name)
+
+    def load_later(self, stored_pages):
+        # Pages are decoded from a StoredPages the first time they're used
+        del self.pages
+        self.stored_pages = stored_pages
+
+    def saved_pages(self):
+        # Pages with what's being typed, leaving the page open
+        pages = list(self.pages)
+        if self.buffer is not None:
+            pages[self.buffer_page] = self.buffer.text()
+        return pages
+
+    def add_page(self):
+        self.pages += [""]
+
+    def open_page(self, page_num):
+        # Typing goes into a GapBuffer until the page is closed
+        if self.buffer_page == page_num:
+            return None
+        self.close_page()
+        self.buffer = GapBuffer(self.pages[page_num])
+        self.buffer_page = page_num
+        self.wrapped_page = None
+
+    def close_page(self):
+        # Put the typed text back into self.pages
+        if self.buffer is None:
+            return None
+        page_num = self.buffer_page
+        changed = self.pages[page_num] != self.buffer.text()
+        self.pages[page_num] = self.buffer.text()
+        self.buffer = None
+        self.buffer_page = None
+        self.wrapped_page = None
+        if changed and self.owner is not None:
+            self.owner.page_changed(page_num)
+
+    def write_page(self, page_num, text):
+        """Insert text at the cursor in one go. What doesn't fit on the
+        page flows onto new pages after it, returns the page the cursor
+        ended on
+        """
+        page_size = 12 * self.char_per_line
+        self.open_page(page_num)
+        edit_index = self.buffer.gap_start
+        self.buffer.insert(text)
+        if len(self.buffer) <= page_size:
+            self.split_text(page_num, edit_index, len(text))
+            return page_num
+
+        # Cut the page into full pages, the cursor stays after the text
+        cursor = self.buffer.gap_start
+        page_text = self.buffer.text()
+        self.buffer = None
+        self.buffer_page = None
+        self.pages[page_num:page_num + 1] = [
+            page_text[page_start:page_start + page_size]
+            for page_start in range(0, len(page_text), page_size)]
+        if self.owner is not None:
+            # Every page after the text moved along
+            for changed_page in range(page_num, len(self.pages)):
+                self.owner.page_changed(changed_page)
+
+        cursor_page = min(page_num + cursor // page_size,
+                          len(self.pages) - 1)
+        self.move_cursor(cursor_page,
+                         cursor - (cursor_page - page_num) * page_size)
+        self.split_text(cursor_page)
+        return cursor_page
+
+    def erase_write(self, page_num, count=1):
+        # Erase count characters before the cursor
+        self.open_page(page_num)
+        erased = self.buffer.erase(count)
+        if 0 < erased:
+            self.split_text(page_num, self.buffer.gap_start, -erased)
+
+    def move_cursor(self, page_num, index):
+        self.open_page(page_num)
+        self.buffer.move_gap(max(0, min(index, len(self.buffer))))
+        # Show the typing bar right away where it moved to
+        self.blink_timer = pygame.time.get_ticks()
+
+    def step_cursor(self, page_num, line_step, char_step):
+        # Arrow keys, up and down keep the typing bar's x where they can
+        self.open_page(page_num)
+        if self.wrapped_page != page_num:
+            self.split_text(page_num)
+        cursor = self.buffer.gap_start
+        if line_step == 0:
+            self.move_cursor(page_num, cursor + char_step)
+            return None
+        line_num = self.cursor_line()
+        if not 0 <= line_num + line_step < len(self.line_starts):
+            return None
+        self.move_cursor(page_num, self.cursor_at(
+            self.cursor_x(line_num, cursor),
+            (line_num + line_step) * (self.font_size + 20)))
+
+    def cursor_line(self):
+        return max(0, bisect.bisect_right(self.line_starts,
+                                          self.buffer.gap_start) - 1)
+
+    def cursor_x(self, line_num, index):
+        # Left edge of the character at index, which is on line_num
+        x = 10
+        for each_char in self.current_page[line_num][
+                :index - self.line_starts[line_num]]:
+            x += FontRegistry.get_advance("impact", self.font_size,
+                                          each_char)
+        return x
+
+    def cursor_at(self, x, y):
+        """Return the index in the page of the gap between characters
+        closest to x and y on the screen
+        """
+        if len(self.current_page) < 1:
+            return 0
+        line_num = max(0, min(int(y // (self.font_size + 20)),
+                              len(self.current_page) - 1))
+        char_x = 10
+        index = self.line_starts[line_num]
+        for each_char in self.current_page[line_num]:
+            advance = FontRegistry.get_advance("impact", self.font_size,
+                                               each_char)
+            if x < char_x + advance / 2:
+                break
+            char_x += advance
+            index += 1
+        return index
+
+    def split_text(self, page_num, from_index=0, shift=None):
+        """Wrap the page into the lines of self.current_page.
+
+        Wrapping is greedy, so lines starting before from_index (the first
+        changed character) can't change. After an edit that moved the rest
+        of the page by shift characters, re-flowing stops at the first line
+        that starts where an old line now does, the lines after it are the
+        same as before
+        """
+        self.open_page(page_num)
+        page = self.buffer
+        page_len = len(page)
+        max_width = 1280 - self.font_size
+        if self.wrapped_page != page_num:
+            from_index = 0
+            shift = None
+
+        # Keep every line that starts before the edit, then re-flow the last
+        # one kept since the edit may have changed where it ends
+        keep_lines = max(1, bisect.bisect_left(self.line_starts,
+                                               min(from_index, page_len)))
+        old_starts = self.line_starts
+        line_starts = old_starts[:keep_lines]
+        moved_starts = {}   # Where old lines after the edit start now
+        if shift is not None:
+            for line_num in range(keep_lines, len(old_starts)):
+                if from_index < old_starts[line_num]:
+                    moved_starts[old_starts[line_num] + shift] = line_num
+
+        same_from = None    # First old line that didn't change
+        line_width = 0
+        char_index = line_starts[-1]
+        for each_char in page.slice(char_index, page_len):
+            if max_width <= line_width:
+                if char_index in moved_starts:
+                    same_from = moved_starts[char_index]
+                    break
+                line_starts += [char_index]
+                line_width = 0
+            line_width += FontRegistry.get_advance("impact", self.font_size,
+                                                   each_char)
+            char_index += 1
+
+        new_lines = len(line_starts)
+        same_lines = []
+        if same_from is not None:
+            line_starts += [old_start + shift
+                            for old_start in old_starts[same_from:]]
+            same_lines = self.current_page[same_from:]
+        line_ends = line_starts[1:] + [page_len]
+        self.current_page = self.current_page[:keep_lines - 1] + \
+            [page.slice(line_starts[line_num], line_ends[line_num])
+             for line_num in range(keep_lines - 1, new_lines)] + same_lines
+        self.line_starts = line_starts
+        self.wrapped_page = page_num
+
+    def update_blink(self):
+        """Advance the typing bar blink, returns True when the bar just
+        appeared or disappeared
+        """
+        if 1400 < pygame.time.get_ticks() - self.blink_timer:
+            self.blink_timer = pygame.time.get_ticks()
+
+        was_shown = self.cursor_shown
+        self.cursor_shown = 0 < pygame.time.get_ticks() - self.blink_timer < 700
+        return was_shown != self.cursor_shown
+
+    def next_blink(self):
+        # Milliseconds until update_blink will show or hide the typing bar
+        blink_time = pygame.time.get_ticks() - self.blink_timer
+        if blink_time < 700:
+            return 700 - blink_time
+        return max(0, 1401 - blink_time)
+
+    def render_page(self, screen, page_num):
+        line_iter = 0
+        end_rect = None
+
+        for each_line in self.current_page:
+            # Unchanged lines come straight out of the surface cache
+            text_img = TEXT_SURFACES.render(each_line, "impact",
+                                            self.font_size, BLACK)
+            screen.blit(text_img, (10, line_iter * (self.font_size + 20)))
+            end_rect = pygame.Rect(text_img.get_width() + 15,
+                                           line_iter * (self.font_size + 20),
+                                           self.font_size / 8, self.font_size)
+            line_iter += 1
+
+        # Render typing bar
+        if self.buffer is not None and 0 < len(self.current_page):
+            line_num = self.cursor_line()
+            self.cursor_rect = pygame.Rect(
+                self.cursor_x(line_num, self.buffer.gap_start) + 5,
+                line_num * (self.font_size + 20),
+                self.font_size / 8, self.font_size)
+        elif end_rect:
+            self.cursor_rect = end_rect
+        else:
+            self.cursor_rect = pygame.Rect(10, 5, self.font_size / 8,
+                                           self.font_size)
+        if self.cursor_shown:
+            pygame.draw.rect(screen, BLACK, self.cursor_rect)
+
+        # Old rendering with an integer limit
+        """if 0 <= page_num < len(self.pages):
+            pos_iter = 0
+            total_words = 13 * self.char_per_line
+            end_rect = None
+
+            for text_index in range(0,
+                                    total_words -
+                                    self.char_per_line,
+                                    self.char_per_line):
+                text = Text(self.pages[page_num][text_index:text_index +
+                                                 self.char_per_line],
+                            (pos_iter + self.char_per_line, text_index),
+                            self.font_size, "impact", BLACK, None)
+                screen.blit(text.text_img, (10,
+                                            text.text_rect.y + 20))
+                pos_iter += 1
+
+                if 0 < len(self.pages[page_num][
+                           text_index:text_index + self.char_per_line]) <= \
+                        self.char_per_line:
+                    end_rect = pygame.Rect(text.text_rect.width + 20,
+                                           text.text_rect.y +
+                                           (text.text_rect.height / 2),
+                                           self.font_size / 4, self.font_size)
+
+            # Render typing bar
+            if 0 < pygame.time.get_ticks() - self.blink_timer < 700:
+                if end_rect:
+                    pygame.draw.rect(screen, BLACK, end_rect)
+                else:
+                    pygame.draw.rect(screen,
+                                     BLACK,
+                                     [10, 5,
+                                      self.font_size / 4, self.font_size])
+
+            if 1400 < pygame.time.get_ticks() - self.blink_timer:
+                self.blink_timer = pygame.time.get_ticks()"""
+
+
+class Icon:
+    def __init__(self, in_color, location, width, height):
+        self.color = in_color
+        self.rect = pygame.Rect(location[0], location[1],
+                                width, height)
+        self.center = self.rect.center
+        self.height = height
+        self.width = width
+        self.border = 0
+        # We add a third of the width/height to proportionally scale shadows
+        self.shadow_rect = pygame.Rect(location[0] + width // 3,
+                                       location[1] + height // 3,
+                                       width, height)
+
+    def render(self, screen, x_offset, y_offset, zoom=1.0):
+        if self.width * zoom < 2:
+            # Too small to tell apart from its shadow, one pixel will do
+            screen.set_at((int(self.center[0] * zoom + x_offset),
+                           int(self.center[1] * zoom + y_offset)), self.color)
+            return None
+
+        # Icon shadow
+        pygame.draw.rect(screen, DARK_GREY, [self.shadow_rect.x * zoom + x_offset,
+                                             self.shadow_rect.y * zoom + y_offset,
+                                             self.shadow_rect.width * zoom,
+                                             self.shadow_rect.height * zoom],
+                         border_radius=self.border)
+
+        # Actual icon/button
+        pygame.draw.rect(screen, self.color, [self.rect.x * zoom + x_offset,
+                                              self.rect.y * zoom + y_offset,
+                                              self.rect.width * zoom,
+                                              self.rect.height * zoom],
+                         border_radius=self.border)
+
+
+class Circle:
+    def __init__(self, in_color, location, in_radius):
+        self.color = in_color
+        self.center = location
+        self.radius = in_radius
+
+        self.display_options = False
+
+    def render(self, screen):
+        pygame.draw.circle(screen, self.color, self.center, self.radius)
+
+
+class Rect:
+    def __init__(self, in_color, location, width, height):
+        self.color = in_color
+        self.center = (location[0] - (width / 2),
+                       location[1] - (height / 2))
+        self.height = height
+        self.width = width
+        self.rect = pygame.Rect(location[0], location[1],
+                                width, height)
+
+    def render(self, screen):
+        pygame.draw.rect(screen, self.color, self.rect)
+
+
+class SpatialGrid:
+    """
+    Class used to bucket datapoints into uniform grid cells by their icon
+    center, so lookups only touch the cells around a location
+    """
+
+    def __init__(self, cell_size, cluster_levels=0):
+        self.cell_size = cell_size
+        self.cells = {}     # (column, row) -> points inside that cell
+        self.point_cells = {}   # point -> (column, row) it's stored under
+        # Each level's cells are twice as wide as the level below, level 1
+        # being twice cell_size. Cells hold [count, sum of x, sum of y]
+        self.clusters = [{} for _ in range(cluster_levels + 1)]
+        self.point_centers = {}     # point -> center counted in clusters
+
+    def cell_key(self, x, y):
+        return int(x // self.cell_size), int(y // self.cell_size)
+
+    def count_cluster(self, center, weight):
+        # Add (weight 1) or take away (weight -1) a point from its clusters
+        col, row = self.cell_key(center[0], center[1])
+        for level in range(1, len(self.clusters)):
+            key = (col >> level, row >> level)
+            cluster = self.clusters[level].setdefault(key, [0, 0, 0])
+            cluster[0] += weight
+            cluster[1] += center[0] * weight
+            cluster[2] += center[1] * weight
+            if cluster[0] < 1:
+                del self.clusters[level][key]
+
+    def insert(self, point):
+        key = self.cell_key(point.icon.center[0], point.icon.center[1])
+        self.cells.setdefault(key, []).append(point)
+        self.point_cells[point] = key
+        if 1 < len(self.clusters):
+            self.point_centers[point] = point.icon.center
+            self.count_cluster(point.icon.center, 1)
+
+    def remove(self, point):
+        key = self.point_cells.pop(point, None)
+        if key is not None:
+            self.cells[key].remove(point)
+            if len(self.cells[key]) < 1:
+                del self.cells[key]
+            if 1 < len(self.clusters):
+                self.count_cluster(self.point_centers.pop(point), -1)
+
+    def move(self, point):
+        # Only re-bucket when the point crossed into another cell
+        key = self.cell_key(point.icon.center[0], point.icon.center[1])
+        if self.point_cells.get(point) != key:
+            self.remove(point)
+            self.insert(point)
+        elif 1 < len(self.clusters):
+            # Cluster centers still follow the point inside its cell
+            self.count_cluster(self.point_centers[point], -1)
+            self.point_centers[point] = point.icon.center
+            self.count_cluster(point.icon.center, 1)
+
+    def rebuild(self, points):
+        # Bucket every point at once, each cluster level is summed from
+        # the level below instead of counting every point into every level.
+        # The garbage collector is kept from walking the map meanwhile
+        gc.disable()
+        try:
+            self.cells = {}
+            self.point_cells = {}
+            self.point_centers = {}
+            self.clusters = [{} for _ in self.clusters]
+            below = {}
+            for point in points:
+                center = point.icon.center
+                key = self.cell_key(center[0], center[1])
+                if key in self.cells:
+                    self.cells[key].append(point)
+                    cluster = below[key]
+                    cluster[0] += 1
+                    cluster[1] += center[0]
+                    cluster[2] += center[1]
+                else:
+                    self.cells[key] = [point]
+                    below[key] = [1, center[0], center[1]]
+                self.point_cells[point] = key
+                self.point_centers[point] = center
+
+            if len(self.clusters) < 2:
+                self.point_centers = {}
+            for level in range(1, len(self.clusters)):
+                for (col, row), (count, sum_x, sum_y) in below.items():
+                    cluster = self.clusters[level].setdefault(
+                        (col >> 1, row >> 1), [0, 0, 0])
+                    cluster[0] += count
+                    cluster[1] += sum_x
+                    cluster[2] += sum_y
+                below = self.clusters[level]
+        finally:
+            gc.enable()
+
+    def query(self, x, y, radius):
+        """Return every point stored in a cell overlapping the square
+        of size radius around x and y
+        """
+        return self.query_area(x - radius, y - radius, x + radius, y + radius)
+
+    def query_area(self, min_x, min_y, max_x, max_y):
+        """Return every point stored in a cell overlapping the area"""
+        min_col, min_row = self.cell_key(min_x, min_y)
+        max_col, max_row = self.cell_key(max_x, max_y)
+        found = []
+        for col in range(min_col, max_col + 1):
+            for row in range(min_row, max_row + 1):
+                if (col, row) in self.cells:
+                    found += self.cells[(col, row)]
+        return found
+
+    def query_clusters(self, level, min_x, min_y, max_x, max_y):
+        """Return the [count, sum of x, sum of y] of every cluster at level
+        whose cell overlaps the area
+        """
+        size = self.cell_size << level
+        found = []
+        for col in range(int(min_x // size), int(max_x // size) + 1):
+            for row in range(int(min_y // size), int(max_y // size) + 1):
+                if (col, row) in self.clusters[level]:
+                    found += [self.clusters[level][(col, row)]]
+        return found
+
+
+class LineGrid:
+    """
+    Class used to bucket the lines between datapoints into the uniform grid
+    cells they pass through, so drawing an area only touches the lines
+    crossing it instead of every line on the map
+    """
+
+    def __init__(self, cell_size, point_ids, pad):
+        self.cell_size = cell_size
+        self.point_ids = point_ids  # The Map's point id -> datapoint
+        # Lines also go in cells they pass within pad of, so the width and
+        # shadow of a line are found without looking in the next cell
+        self.pad = pad
+        self.cells = {}     # (column, row) -> (from id, to id) of lines in it
+
+    def line_spans(self, start, end):
+        """Return the (column, first row, last row) of the cells the line
+        between start and end passes within pad of, one column at a time
+        """
+        if end[0] < start[0]:
+            start, end = end, start
+        size = self.cell_size
+        pad = self.pad
+        slope = 0
+        if start[0] < end[0]:
+            slope = (end[1] - start[1]) / (end[0] - start[0])
+        spans = []
+        for col in range(int((start[0] - pad) // size),
+                         int((end[0] + pad) // size) + 1):
+            # Heights of the line where it enters and leaves this column
+            enter_y = start[1] + slope * (
+                max(start[0], col * size - pad) - start[0])
+            leave_y = start[1] + slope * (
+                min(end[0], (col + 1) * size + pad) - start[0])
+            if start[0] == end[0]:
+                enter_y, leave_y = start[1], end[1]
+            spans += [(col, int((min(enter_y, leave_y) - pad) // size),
+                       int((max(enter_y, leave_y) + pad) // size))]
+        return spans
+
+    def insert(self, from_id, to_id):
+        line = (from_id, to_id)
+        for col, first_row, last_row in self.line_spans(
+                self.point_ids[from_id].icon.center,
+                self.point_ids[to_id].icon.center):
+            for row in range(first_row, last_row + 1):
+                if (col, row) in self.cells:
+                    self.cells[(col, row)].append(line)
+                else:
+                    self.cells[(col, row)] = [line]
+
+    def remove(self, from_id, to_id, from_center=None, to_center=None):
+        """Take a line out of the cells it was put in, with the centers
+        its points had then if either has moved since
+        """
+        if from_center is None:
+            from_center = self.point_ids[from_id].icon.center
+        if to_center is None:
+            to_center = self.point_ids[to_id].icon.center
+        line = (from_id, to_id)
+        for col, first_row, last_row in self.line_spans(from_center,
+                                                        to_center):
+            for row in range(first_row, last_row + 1):
+                cell = self.cells.get((col, row), [])
+                if line in cell:
+                    cell.remove(line)
+                    if len(cell) < 1:
+                        del self.cells[(col, row)]
+
+    def move_point(self, point_id, old_center, edges):
+        # Lines follow a moved point into the cells it now reaches
+        for to_id in edges.lines_from(point_id):
+            self.remove(point_id, to_id, from_center=old_center)
+            self.insert(point_id, to_id)
+        for from_id in edges.lines_to(point_id):
+            self.remove(from_id, point_id, to_center=old_center)
+            self.insert(from_id, point_id)
+
+    def rebuild(self, edges):
+        """Bucket every line again, after many points moved at once. With
+        NumPy the cells of all lines are found in one go, the same way
+        line_spans finds them for one line
+        """
+        self.cells.clear()
+        lines = [(from_id, to_id) for from_id, to_ids in edges.forward.items()
+                 for to_id in to_ids]
+        if np is None or len(lines) < 1:
+            for from_id, to_id in lines:
+                self.insert(from_id, to_id)
+            return None
+
+        ends = np.array([self.point_ids[from_id].icon.center +
+                         self.point_ids[to_id].icon.center
+                         for from_id, to_id in lines],
+                        np.float64).reshape(-1, 4)
+        flip = ends[:, 2] < ends[:, 0]
+        ends[flip] = ends[flip][:, [2, 3, 0, 1]]
+        start_x, start_y, end_x, end_y = ends.T
+        size = self.cell_size
+        pad = self.pad
+        slope = np.divide(end_y - start_y, end_x - start_x,
+                          out=np.zeros(len(lines)), where=start_x < end_x)
+
+        # One row per column each line crosses
+        first_col = np.floor_divide(start_x - pad, size).astype(np.int64)
+        col_counts = np.floor_divide(end_x + pad, size).astype(np.int64) - \
+            first_col + 1
+        line_rows = np.repeat(np.arange(len(lines)), col_counts)
+        cols = np.arange(len(line_rows)) - np.repeat(
+            np.cumsum(col_counts) - col_counts, col_counts) + \
+            first_col[line_rows]
+        start_x, start_y = start_x[line_rows], start_y[line_rows]
+        end_x, end_y = end_x[line_rows], end_y[line_rows]
+        enter_y = start_y + slope[line_rows] * (
+            np.maximum(start_x, cols * size - pad) - start_x)
+        leave_y = start_y + slope[line_rows] * (
+            np.minimum(end_x, (cols + 1) * size + pad) - start_x)
+        enter_y = np.where(start_x == end_x, start_y, enter_y)
+        leave_y = np.where(start_x == end_x, end_y, leave_y)
+        first_row = np.floor_divide(np.minimum(enter_y, leave_y) - pad,
+                                    size).astype(np.int64)
+        row_counts = np.floor_divide(np.maximum(enter_y, leave_y) + pad,
+                                     size).astype(np.int64) - first_row + 1
+
+        # Then one row per cell, sorted so each cell's lines sit together
+        cell_lines = np.repeat(line_rows, row_counts)
+        cell_cols = np.repeat(cols, row_counts)
+        cell_rows = np.arange(len(cell_lines)) - np.repeat(
+            np.cumsum(row_counts) - row_counts, row_counts) + \
+            np.repeat(first_row, row_counts)
+        top_row = cell_rows.min()
+        cell_nums = (cell_cols - cell_cols.min()) * (
+            cell_rows.max() - top_row + 1) + cell_rows - top_row
+        order = np.argsort(cell_nums)
+        cell_nums = cell_nums[order]
+        starts = np.flatnonzero(np.concatenate(([True],
+                                                np.diff(cell_nums) != 0)))
+        stops = np.append(starts[1:], len(order))
+        cell_lines = np.fromiter(lines, object, len(lines))[cell_lines[order]]
+        for col, row, start, stop in zip(cell_cols[order][starts].tolist(),
+                                         cell_rows[order][starts].tolist(),
+                                         starts.tolist(), stops.tolist()):
+            self.cells[(col, row)] = cell_lines[start:stop].tolist()
+
+    def query_area(self, min_x, min_y, max_x, max_y):
+        """Return the (from id, to id) of every line stored in a cell
+        overlapping the area
+        """
+        min_col = int(min_x // self.cell_size)
+        max_col = int(max_x // self.cell_size)
+        found = set()
+        for col in range(min_col, max_col + 1):
+            for row in range(int(min_y // self.cell_size),
+                             int(max_y // self.cell_size) + 1):
+                if (col, row) in self.cells:
+                    found.update(self.cells[(col, row)])
+        return found
+
+
+class StaticLayer:
+    """
+    Class used to cache unselected map geometry in offscreen tiles, so
+    panning only blits tiles and an edit only redraws the tiles it touched
+    """
+
+    def __init__(self, tile_size, max_tiles):
+        self.tile_size = tile_size
+        self.max_tiles = max_tiles  # Least recently shown tiles go first
+        self.tiles = OrderedDict()  # (column, row) -> tile surface
+        self.style = None   # Tiles are thrown out when the style changes
+        self.zoom = 1.0     # or when the zoom changes
+
+    def set_style(self, new_style, zoom=1.0):
+        if self.style != new_style or self.zoom != zoom:
+            self.style = new_style
+            self.zoom = zoom
+            self.clear()
+
+    def clear(self):
+        self.tiles.clear()
+
+    def tile_rect(self, key):
+        # Area of the map a tile covers, without any offset
+        span = self.tile_size / self.zoom
+        return pygame.Rect(math.floor(key[0] * span),
+                           math.floor(key[1] * span),
+                           math.ceil(span) + 1, math.ceil(span) + 1)
+
+    def invalidate(self, map_rect):
+        for key in [key for key in self.tiles
+                    if self.tile_rect(key).colliderect(map_rect)]:
+            del self.tiles[key]
+
+    def invalidate_line(self, start, end, border):
+        # Only the tiles a line passes through, not its whole bounding box
+        for key in [key for key in self.tiles
+                    if self.tile_rect(key).inflate(border, border).clipline(
+                        start, end)]:
+            del self.tiles[key]
+
+    def render(self, screen, scene, viewport):
+        first_col = (viewport.left - scene.x_offset) // self.tile_size
+        last_col = (viewport.right - 1 - scene.x_offset) // self.tile_size
+        first_row = (viewport.top - scene.y_offset) // self.tile_size
+        last_row = (viewport.bottom - 1 - scene.y_offset) // self.tile_size
+        shown_keys = [(col, row) for col in range(first_col, last_col + 1)
+                      for row in range(first_row, last_row + 1)]
+
+        missing_keys = [key for key in shown_keys if key not in self.tiles]
+        if 0 < len(missing_keys):
+            self.build_tiles(scene, missing_keys)
+
+        for key in shown_keys:
+            self.tiles.move_to_end(key)
+            screen.blit(self.tiles[key],
+                        (key[0] * self.tile_size + scene.x_offset,
+                         key[1] * self.tile_size + scene.y_offset))
+
+        while self.max_tiles < len(self.tiles):
+            self.tiles.popitem(last=False)
+
+    def build_tiles(self, scene, keys):
+        new_tiles = {}
+        for key in keys:
+            new_tiles[key] = pygame.Surface((self.tile_size, self.tile_size))
+            new_tiles[key].fill(WHITE)
+
+        selected_id = None
+        if scene.select_point is not None:
+            selected_id = scene.select_point.id
+
+        cluster_level = scene.cluster_level()
+        if 0 < cluster_level:
+            # Zoomed far out, points are summed up into cluster glyphs
+            self.build_clusters(scene, new_tiles, cluster_level)
+            return None
+
+        # Each tile only checks the lines crossing the grid cells under it,
+        # clipped a little past the tile so line shadows carry over borders.
+        # Lines are padded into the cells they pass close to, so only zoomed
+        # out borders reach past the cells under the tile itself. Lines are
+        # sorted so they overlap the same way on every tile
+        span = self.tile_size / self.zoom
+        border = int(4 / self.zoom) + 1
+        reach = max(0, border + 2 - scene.line_grid.pad)
+        for key, tile in new_tiles.items():
+            area = self.tile_rect(key).inflate(border * 2, border * 2)
+            for from_id, to_id in sorted(scene.line_grid.query_area(
+                    key[0] * span - reach, key[1] * span - reach,
+                    (key[0] + 1) * span + reach - 1,
+                    (key[1] + 1) * span + reach - 1)):
+                if from_id == selected_id or to_id == selected_id:
+                    continue
+                from_point = scene.point_ids[from_id]
+                to_point = scene.point_ids[to_id]
+                if area.clipline(from_point.icon.center,
+                                 to_point.icon.center):
+                    from_point.render_lines(
+                        tile, [(to_point,
+                                scene.edges.lines_from(from_id)[to_id])],
+                        -key[0] * self.tile_size, -key[1] * self.tile_size,
+                        tile.get_rect().inflate(4, 4), self.zoom)
+
+        # Points whose titles can hang into a tile get drawn on it as well
+        for key, tile in new_tiles.items():
+            area = self.tile_rect(key).inflate(scene.map_margin() * 2,
+                                               scene.map_margin() * 2)
+            for each_point in scene.point_grid.query_area(
+                    area.left, area.top, area.right, area.bottom):
+                if each_point.id != selected_id:
+                    scene.render_point(tile, each_point,
+                                       -key[0] * self.tile_size,
+                                       -key[1] * self.tile_size,
+                                       tile.get_rect())
+            self.tiles[key] = tile
+
+    def build_clusters(self, scene, new_tiles, level):
+        # Clusters are drawn at their points' average center, growing with
+        # how many points they hold. Single points are left as a pixel
+        max_radius = 8
+        for key, tile in new_tiles.items():
+            area = self.tile_rect(key).inflate(
+                int(max_radius * 2 / self.zoom), int(max_radius * 2 / self.zoom))
+            for count, sum_x, sum_y in scene.point_grid.query_clusters(
+                    level, area.left, area.top, area.right, area.bottom):
+                center = (int(sum_x / count * self.zoom) - key[0] * self.tile_size,
+                          int(sum_y / count * self.zoom) - key[1] * self.tile_size)
+                if count < 2:
+                    tile.set_at(center, DARK_GREY)
+                else:
+                    pygame.draw.circle(tile, DARK_GREY, center,
+                                       min(max_radius, 1 + int(math.log2(count))))
+            self.tiles[key] = tile
+
+
+class SearchIndex:
+    """
+    Class used to find datapoints by the words in their title and
+    description pages. Every title and page is indexed on its own, so an
+    edit only indexes the text that changed again
+    """
+
+    def __init__(self):
+        self.postings = {}  # word -> {point id: titles/pages holding it}
+        self.field_words = {}   # (point id, "title" or page number) -> words
+        self.point_fields = {}  # point id -> fields with words in them
+        self.words = []     # Every word indexed, sorted to look up prefixes
+
+    @staticmethod
+    def split_words(text):
+        return set(re.findall(r"[a-z0-9]+", text.lower()))
+
+    def add_point(self, each_point):
+        self.set_text(each_point.id, "title", each_point.title.text)
+        for page_num, page in enumerate(each_point.description.pages):
+            self.set_text(each_point.id, page_num, page)
+
+    def remove_point(self, point_id):
+        for field in list(self.point_fields.get(point_id, [])):
+            self.set_text(point_id, field, "")
+
+    def set_text(self, point_id, field, text):
+        old_words = self.field_words.get((point_id, field), set())
+        new_words = self.split_words(text)
+
+        for word in old_words - new_words:
+            self.postings[word][point_id] -= 1
+            if self.postings[word][point_id] < 1:
+                del self.postings[word][point_id]
+            if len(self.postings[word]) < 1:
+                del self.postings[word]
+                del self.words[bisect.bisect_left(self.words, word)]
+
+        for word in new_words - old_words:
+            word_points = self.postings.get(word)
+            if word_points is None:
+                word_points = self.postings[word] = {}
+                bisect.insort(self.words, word)
+            word_points[point_id] = word_points.get(point_id, 0) + 1
+
+        if 0 < len(new_words):
+            self.field_words[(point_id, field)] = new_words
+            self.point_fields.setdefault(point_id, set()).add(field)
+        elif (point_id, field) in self.field_words:
+            del self.field_words[(point_id, field)]
+            self.point_fields[point_id].discard(field)
+            if len(self.point_fields[point_id]) < 1:
+                del self.point_fields[point_id]
+
+    def search(self, query, limit):
+        """Return the ids of up to limit points holding every word in
+        query. The last word can be unfinished, it matches as a prefix
+        """
+        query_words = re.findall(r"[a-z0-9]+", query.lower())
+        if len(query_words) < 1:
+            return []
+        if re.search(r"[a-z0-9]$", query.lower()):
+            prefix = query_words.pop()
+        else:
+            prefix = None
+
+        # Words the last one could be finished as, in alphabetical order
+        prefix_words = []
+        if prefix is not None:
+            word_ind = bisect.bisect_left(self.words, prefix)
+            while word_ind < len(self.words) and \
+                    self.words[word_ind].startswith(prefix):
+                prefix_words += [self.words[word_ind]]
+                word_ind += 1
+
+        if len(query_words) < 1:
+            # Only an unfinished word, stop once there are enough points
+            found = []
+            for word in prefix_words:
+                for point_id in self.postings[word]:
+                    if point_id not in found:
+                        found += [point_id]
+                        if limit <= len(found):
+                            return found
+            return found
+
+        # Start from the rarest word so the sets only get smaller
+        query_words.sort(key=lambda word: len(self.postings.get(word, {})))
+        found = set(self.postings.get(query_words[0], {}))
+        for word in query_words[1:]:
+            found.intersection_update(self.postings.get(word, {}))
+        if prefix is None:
+            return sorted(found)[:limit]
+
+        matches = []
+        for point_id in sorted(found):
+            point_words = set()
+            for field in self.point_fields[point_id]:
+                point_words |= self.field_words[(point_id, field)]
+            if any(word.startswith(prefix) for word in point_words):
+                matches += [point_id]
+                if limit <= len(matches):
+                    break
+        return matches
+
+
+class Minimap:
+    """
+    Class used to keep a downsampled overview of every datapoint in a
+    cached surface. Points being added, moved or removed only touch their
+    own pixel, the surface is only redrawn when a point leaves its bounds
+    """
+
+    def __init__(self, panel):
+        self.panel = panel  # Where the minimap is shown on screen
+        self.surface = pygame.Surface(panel.size)
+        self.border = 2
+        self.bounds = None  # Area of the map the minimap covers
+        self.scale = 1.0
+        self.pixel_counts = {}  # Minimap pixel -> how many points are on it
+        self.stale = True   # Redrawn from every point on the next render
+
+    def rebuild(self, points):
+        self.stale = False
+        self.pixel_counts = {}
+        self.surface.fill(WHITE)
+        pygame.draw.rect(self.surface, GREY, self.surface.get_rect(), 1)
+        if len(points) < 1:
+            self.bounds = None
+            return None
+
+        min_x = min(each_point.icon.center[0] for each_point in points)
+        min_y = min(each_point.icon.center[1] for each_point in points)
+        max_x = max(each_point.icon.center[0] for each_point in points)
+        max_y = max(each_point.icon.center[1] for each_point in points)
+        # Leave room around the points so moving one rarely needs a redraw
+        pad = max(100, (max_x - min_x) // 4, (max_y - min_y) // 4)
+        self.bounds = pygame.Rect(min_x - pad, min_y - pad,
+                                  max_x - min_x + pad * 2,
+                                  max_y - min_y + pad * 2)
+        self.scale = min((self.panel.width - self.border * 2 - 1) /
+                         self.bounds.width,
+                         (self.panel.height - self.border * 2 - 1) /
+                         self.bounds.height)
+        for each_point in points:
+            self.add(each_point.icon.center)
+
+    def pixel(self, center):
+        return (int((center[0] - self.bounds.x) * self.scale) + self.border,
+                int((center[1] - self.bounds.y) * self.scale) + self.border)
+
+    def add(self, center):
+        # Returns True when a pixel changed
+        if self.stale:
+            return False
+        if self.bounds is None or not self.bounds.collidepoint(center):
+            self.stale = True
+            return True
+        pixel = self.pixel(center)
+        self.pixel_counts[pixel] = self.pixel_counts.get(pixel, 0) + 1
+        if self.pixel_counts[pixel] == 1:
+            self.surface.set_at(pixel, DARK_GREY)
+            return True
+        return False
+
+    def remove(self, center):
+        # Returns True when a pixel changed
+        if self.stale:
+            return False
+        pixel = self.pixel(center)
+        self.pixel_counts[pixel] -= 1
+        if self.pixel_counts[pixel] < 1:
+            del self.pixel_counts[pixel]
+            self.surface.set_at(pixel, WHITE)
+            return True
+        return False
+
+    def move(self, old_center, new_center):
+        if self.stale or self.bounds is None:
+            return False
+        if self.bounds.collidepoint(new_center) and \
+                self.pixel(old_center) == self.pixel(new_center):
+            return False
+        self.remove(old_center)
+        self.add(new_center)
+        return True
+
+    def to_map(self, x, y):
+        # Map position under the screen position x and y
+        return ((x - self.panel.x - self.border) / self.scale + self.bounds.x,
+                (y - self.panel.y - self.border) / self.scale + self.bounds.y)
+
+    def render(self, screen, scene):
+        if self.stale:
+            self.rebuild(scene.datapoints)
+        screen.blit(self.surface, self.panel)
+
+        # Outline the part of the map that's on screen
+        min_x, min_y = scene.screen_to_map(0, 0)
+        max_x, max_y = scene.screen_to_map(screen.get_width(),
+                                           screen.get_height())
+        left, top = self.pixel((min_x, min_y))
+        right, bottom = self.pixel((max_x, max_y))
+        view_rect = pygame.Rect(self.panel.x + left, self.panel.y + top,
+                                max(1, right - left), max(1, bottom - top))
+        view_rect = view_rect.clip(self.panel)
+        if 0 < view_rect.width and 0 < view_rect.height:
+            pygame.draw.rect(screen, ORANGE, view_rect, 1)
+
+
+class EdgeTable:
+    """
+    Class used to store the lines between datapoints by id, with forward
+    and reverse adjacency so toggling a line is O(1) and removing a point
+    only touches its own lines
+    """
+
+    def __init__(self):
+        self.forward = {}   # point id -> {other point id: line color}
+        self.reverse = {}   # point id -> ids of points with lines to it
+        self.version = 0    # Goes up whenever a line is added or removed
+        self.line_grid = None   # Set by the Map drawing these lines
+
+    def add(self, from_id, to_id, line_color):
+        if self.line_grid is not None and not self.has(from_id, to_id):
+            self.line_grid.insert(from_id, to_id)
+        self.forward.setdefault(from_id, {})[to_id] = line_color
+        self.reverse.setdefault(to_id, set()).add(from_id)
+        self.version += 1
+
+    def remove(self, from_id, to_id):
+        if self.has(from_id, to_id):
+            if self.line_grid is not None:
+                self.line_grid.remove(from_id, to_id)
+            del self.forward[from_id][to_id]
+            self.reverse[to_id].discard(from_id)
+            self.version += 1
+
+    def has(self, from_id, to_id):
+        return from_id in self.forward and to_id in self.forward[from_id]
+
+    def lines_from(self, from_id):
+        return self.forward.get(from_id, {})
+
+    def lines_to(self, to_id):
+        return self.reverse.get(to_id, set())
+
+    def remove_point(self, point_id):
+        # Drop every line from or to point_id in O(degree)
+        for to_id in self.forward.pop(point_id, {}):
+            self.reverse[to_id].discard(point_id)
+            if self.line_grid is not None:
+                self.line_grid.remove(point_id, to_id)
+        for from_id in self.reverse.pop(point_id, set()):
+            del self.forward[from_id][point_id]
+            if self.line_grid is not None:
+                self.line_grid.remove(from_id, point_id)
+        self.version += 1
+
+    def neighbors(self, point_id):
+        # Points linked to point_id, whichever way the line goes
+        return list(self.lines_from(point_id)) + list(self.lines_to(point_id))
+
+
+class ForceLayout:
+    """
+    Class used to spread datapoints out with a force-directed layout. Lines
+    pull their points together while every point pushes the others away.
+    Points far away are summed up per cell of a grid at every level
+    (Barnes-Hut style), so an iteration is O(n log n). Work is done a chunk
+    of points at a time so it can run a little every frame
+    """
+    def __init__(self, points, edges):
+        self.ids = [each_point.id for each_point in points]
+        rows = {point_id: row for row, point_id in enumerate(self.ids)}
+        self.positions = np.array([each_point.icon.center
+                                   for each_point in points],
+                                  dtype=np.float64).reshape(-1, 2)
+        # Points stacked on one spot would have nowhere to push each other
+        self.positions += np.random.default_rng(0).uniform(
+            -1, 1, self.positions.shape)
+        self.line_rows = np.array(
+            [(rows[from_id], rows[to_id])
+             for from_id, lines in edges.forward.items() for to_id in lines],
+            dtype=np.int64).reshape(-1, 2)
+        self.edges_version = edges.version  # Lines the layout was made for
+
+        self.spacing = 80.0     # Distance lines settle at
+        self.gravity = 1.0  # Keeps unconnected groups from drifting away
+        self.iterations = 150
+        self.iteration = 0
+        self.start_temperature = self.spacing * 5
+        self.chunk_size = 512   # Points pushed apart per step
+        # Cells around a point's parent cell, at the level below it
+        offset_x, offset_y = np.meshgrid(np.arange(-2, 4), np.arange(-2, 4))
+        self.offset_x = offset_x.ravel()[None, :]
+        self.offset_y = offset_y.ravel()[None, :]
+        self.next_row = 0   # First row of the next chunk
+        self.next_line = 0  # First line of the next chunk
+        self.forces = None
+        self.finest = 2     # Level with the smallest cells
+        self.finest_cells = None    # Cell of every point at the finest level
+        self.levels = []    # Grid cells of every level for this iteration
+
+    def done(self):
+        return self.iterations <= self.iteration
+
+    def run(self, budget_ms):
+        """Keep working until budget_ms has passed, returns True once the
+        layout is done
+        """
+        deadline = time.perf_counter() + budget_ms / 1000
+        while not self.done() and time.perf_counter() < deadline:
+            if self.forces is None:
+                self.start_iteration()
+            elif len(self.levels) < self.finest - 1:
+                self.add_level()
+            elif self.next_row < len(self.ids):
+                rows = slice(self.next_row, self.next_row + self.chunk_size)
+                self.forces[rows] += self.repulsion(rows)
+                self.next_row += self.chunk_size
+            elif self.next_line < len(self.line_rows):
+                lines = slice(self.next_line,
+                              self.next_line + self.chunk_size * 16)
+                self.pull(lines)
+                self.next_line += self.chunk_size * 16
+            else:
+                self.finish_iteration()
+        return self.done()
+
+    def start_iteration(self):
+        self.forces = np.zeros_like(self.positions)
+        self.next_row = 0
+        self.next_line = 0
+        corner = self.positions.min(axis=0)
+        size = max(1.0, float((self.positions.max(axis=0) - corner).max()))
+        size *= 1.0001  # Points on the far edge stay inside the last cell
+
+        # About two points per cell at the finest level
+        self.finest = min(10, max(2, math.ceil(
+            math.log(max(4, len(self.ids) / 2), 4))))
+        self.finest_cells = ((self.positions - corner) /
+                             (size / 2 ** self.finest)).astype(np.int64)
+        self.levels = []
+
+    def add_level(self):
+        # Levels go from 4 cells a side up to the finest, one per step
+        level = len(self.levels) + 2
+        side = 2 ** level
+        cells = self.finest_cells >> (self.finest - level)
+        cell_num = cells[:, 1] * side + cells[:, 0]
+        self.levels += [(side, cells[:, 0], cells[:, 1],
+                         np.bincount(cell_num, minlength=side * side),
+                         np.bincount(cell_num, self.positions[:, 0],
+                                     side * side),
+                         np.bincount(cell_num, self.positions[:, 1],
+                                     side * side))]
+
+    def repulsion(self, rows):
+        x = self.positions[rows, 0][:, None]
+        y = self.positions[rows, 1][:, None]
+        forces = np.zeros((len(x), 2))
+        for level_ind, (side, cells_x, cells_y, mass, sum_x, sum_y) in \
+                enumerate(self.levels):
+            cell_x = cells_x[rows][:, None]
+            cell_y = cells_y[rows][:, None]
+            near_x = (cell_x >> 1) * 2 + self.offset_x
+            near_y = (cell_y >> 1) * 2 + self.offset_y
+            use = (0 <= near_x) & (near_x < side) & \
+                (0 <= near_y) & (near_y < side)
+            if level_ind < len(self.levels) - 1:
+                # Cells next to the point's own are done a level down
+                use &= (1 < abs(near_x - cell_x)) | (1 < abs(near_y - cell_y))
+            cell_num = np.where(use, near_y * side + near_x, 0)
+
+            # A point doesn't push itself, take it out of its own cell
+            own = use & (near_x == cell_x) & (near_y == cell_y)
+            cell_mass = np.where(use, mass[cell_num] - own, 0)
+            center_x = (sum_x[cell_num] - own * x) / np.maximum(cell_mass, 1)
+            center_y = (sum_y[cell_num] - own * y) / np.maximum(cell_mass, 1)
+            away_x = x - center_x
+            away_y = y - center_y
+            push = self.spacing ** 2 * cell_mass / \
+                np.maximum(away_x ** 2 + away_y ** 2, 0.01)
+            forces[:, 0] += (push * away_x).sum(axis=1)
+            forces[:, 1] += (push * away_y).sum(axis=1)
+        return forces
+
+    def pull(self, lines):
+        # Lines pull their points together, harder the longer they are
+        line_rows = self.line_rows[lines]
+        along = self.positions[line_rows[:, 1]] - \
+            self.positions[line_rows[:, 0]]
+        pull = along * np.sqrt((along ** 2).sum(axis=1))[:, None] / \
+            self.spacing
+        for axis in range(2):
+            self.forces[:, axis] += \
+                np.bincount(line_rows[:, 0], pull[:, axis], len(self.ids)) - \
+                np.bincount(line_rows[:, 1], pull[:, axis], len(self.ids))
+
+    def finish_iteration(self):
+        self.forces -= self.gravity * (self.positions -
+                                       self.positions.mean(axis=0))
+
+        # Points move less and less as the layout cools down
+        temperature = max(1.0, self.start_temperature *
+                          (1 - self.iteration / self.iterations))
+        lengths = np.maximum(np.sqrt((self.forces ** 2).sum(axis=1)), 1e-9)
+        self.positions += self.forces * \
+            (np.minimum(lengths, temperature) / lengths)[:, None]
+        self.forces = None
+        self.iteration += 1
+
+
+class GraphQueries:
+    """
+    Class used to answer shortest path, neighborhood and connected
+    component queries over an EdgeTable, with lines treated as undirected.
+    Answers are kept until the table's version changes
+    """
+
+    def __init__(self, edges):
+        self.edges = edges
+        self.version = edges.version
+        self.answers = {}   # (query, arguments) -> answer
+        self.max_answers = 64
+
+    def cached(self, key, find_answer):
+        if self.version != self.edges.version or \
+                self.max_answers <= len(self.answers):
+            self.answers.clear()
+            self.version = self.edges.version
+        if key not in self.answers:
+            self.answers[key] = find_answer()
+        return self.answers[key]
+
+    def shortest_path(self, from_id, to_id):
+        """Return the ids from from_id to to_id along the fewest lines,
+        or an empty list when they aren't connected
+        """
+        return self.cached(("path", from_id, to_id),
+                           lambda: self.find_path(from_id, to_id))
+
+    def neighborhood(self, point_id, hops):
+        """Return {id: hops away} for every point within hops of point_id,
+        point_id included
+        """
+        return self.cached(("near", point_id, hops),
+                           lambda: self.find_neighborhood(point_id, hops))
+
+    def components(self):
+        """Return {id: component number} for every point with a line,
+        numbered from the biggest component down
+        """
+        return self.cached(("components",), self.find_components)
+
+    def find_path(self, from_id, to_id):
+        # Points in different components never have a path between them
+        component_of = self.answers.get(("components",))
+        if component_of is not None and \
+                component_of.get(from_id, -1) != component_of.get(to_id, -2):
+            return [] if from_id != to_id else [from_id]
+
+        # Search from both ends, always growing the smaller frontier
+        came_from = [{from_id: None}, {to_id: None}]
+        frontiers = [[from_id], [to_id]]
+        meet_id = from_id if from_id == to_id else None
+        while meet_id is None and 0 < len(frontiers[0]) and \
+                0 < len(frontiers[1]):
+            side = 0 if len(frontiers[0]) <= len(frontiers[1]) else 1
+            next_frontier = []
+            for point_id in frontiers[side]:
+                for other_id in self.edges.neighbors(point_id):
+                    if other_id not in came_from[side]:
+                        came_from[side][other_id] = point_id
+                        next_frontier += [other_id]
+                        if other_id in came_from[1 - side]:
+                            meet_id = other_id
+                            break
+                if meet_id is not None:
+                    break
+            frontiers[side] = next_frontier
+
+        if meet_id is None:
+            return []
+        path = [meet_id]
+        while came_from[0][path[-1]] is not None:
+            path += [came_from[0][path[-1]]]
+        path.reverse()
+        while came_from[1][path[-1]] is not None:
+            path += [came_from[1][path[-1]]]
+        return path
+
+    def find_neighborhood(self, point_id, hops):
+        distance = {point_id: 0}
+        frontier = [point_id]
+        for hop in range(1, hops + 1):
+            next_frontier = []
+            for each_id in frontier:
+                for other_id in self.edges.neighbors(each_id):
+                    if other_id not in distance:
+                        distance[other_id] = hop
+                        next_frontier += [other_id]
+            frontier = next_frontier
+        return distance
+
+    def find_components(self):
+        groups = []
+        seen = set()
+        for start_id in list(self.edges.forward) + list(self.edges.reverse):
+            if start_id in seen or len(self.edges.neighbors(start_id)) < 1:
+                continue
+            seen.add(start_id)
+            group = [start_id]
+            group_ind = 0
+            while group_ind < len(group):
+                for other_id in self.edges.neighbors(group[group_ind]):
+                    if other_id not in seen:
+                        seen.add(other_id)
+                        group += [other_id]
+                group_ind += 1
+            groups += [group]
+
+        groups.sort(key=len, reverse=True)
+        component_of = {}
+        for group_num, group in enumerate(groups):
+            for point_id in group:
+                component_of[point_id] = group_num
+        return component_of
+
+
+class FrameTimer:
+    """
+    Class used to time each phase of a frame into a ring buffer, show the
+    frame time percentiles on screen and dump the kept frames into a CSV
+    """
+    phases = ["input", "update", "render", "display"]
+
+    def __init__(self, size):
+        self.size = size    # How many of the latest frames are kept
+        self.frames = []    # Nanoseconds spent in each phase, per frame
+        self.next_frame = 0     # Where the next frame goes in the buffer
+        self.phase_times = [0] * len(self.phases)
+        self.phase_start = 0
+        self.overlay = None
+        self.overlay_timer = 0
+        self.overlay_delay = 500    # Milliseconds between overlay refreshes
+
+    def start(self):
+        self.phase_times = [0] * len(self.phases)
+        self.phase_start = time.perf_counter_ns()
+
+    def skip(self):
+        # Leave out time spent between phases, like waiting on the clock
+        self.phase_start = time.perf_counter_ns()
+
+    def lap(self, phase_name):
+        lap_time = time.perf_counter_ns()
+        self.phase_times[self.phases.index(phase_name)] += \
+            lap_time - self.phase_start
+        self.phase_start = lap_time
+
+    def end_frame(self):
+        if len(self.frames) < self.size:
+            self.frames += [tuple(self.phase_times)]
+        else:
+            self.frames[self.next_frame] = tuple(self.phase_times)
+        self.next_frame = (self.next_frame + 1) % self.size
+
+    def ordered_frames(self):
+        # Oldest kept frame first
+        if len(self.frames) < self.size:
+            return self.frames
+        return self.frames[self.next_frame:] + self.frames[:self.next_frame]
+
+    def percentiles(self):
+        frame_totals = sorted(sum(frame) for frame in self.frames)
+        return [frame_totals[min(len(frame_totals) - 1,
+                                 int(len(frame_totals) * percent / 100))]
+                / 1000000 for percent in (50, 95, 99)]
+
+    def render(self, screen, force):
+        """Draw the overlay in the top right corner when it's due for a
+        refresh or force is True, returns the rect drawn over or None
+        """
+        refresh = self.overlay_delay < \
+            pygame.time.get_ticks() - self.overlay_timer
+        if len(self.frames) < 1 or not (force or refresh):
+            return None
+
+        if refresh or self.overlay is None:
+            self.overlay_timer = pygame.time.get_ticks()
+            self.overlay = Text("p50 %.2f  p95 %.2f  p99 %.2f ms" %
+                                tuple(self.percentiles()),
+                                (0, 0), 14, "impact", WHITE, None)
+
+        # Fixed size box so a shorter line fully covers the last one
+        overlay_rect = pygame.Rect(screen.get_width() - 250, 0, 250, 24)
+        pygame.draw.rect(screen, DARK_GREY, overlay_rect)
+        self.overlay.text_rect.center = overlay_rect.center
+        screen.blit(self.overlay.text_img, self.overlay.text_rect)
+        return overlay_rect
+
+    def dump_csv(self, csv_path):
+        with open(csv_path, "w") as out_file:
+            out_file.write("frame," + ",".join(
+                [phase_name + "_ms" for phase_name in self.phases]) +
+                ",total_ms\n")
+            for frame_num, frame in enumerate(self.ordered_frames()):
+                out_file.write(str(frame_num) + "," + ",".join(
+                    ["%.4f" % (phase_time / 1000000) for phase_time in frame])
+                    + ",%.4f\n" % (sum(frame) / 1000000))
+
+
+class Program:
+    """
+    Class responsible for how the game runs
+    """
+
+    def __init__(self, width, height, map_format=None) -> None:
+        self.running = True  # Determines if the game is running
+        # Initialize game memory
+        self.memory = Memory(width, height, map_format)
+        # Set ICM_PROFILE to time every frame, shown on screen and saved
+        self.frame_timer = None
+        if os.environ.get("ICM_PROFILE"):
+            self.frame_timer = FrameTimer(10000)
+        self.profile_path = "frame_times.csv"
+
+    def run(self, width, height, current_scene):
+        """
+        Where the actual game loop is running.
+        Everything game related is defined in scene.
+        Scene is initialized by running Program (in main
+        which is outer scope) with the screen size and scene.
+        At this point in time, scene is run as MenuScene.
+
+        Everything relating to calling the scene is called here, such as
+        input, update, and render while the game is running.
+
+        If the game isn't running, then in the final loop (or the loop when
+        the game is told to close by various means), self.running is set to
+        false and the scene is changed to nothing. Then the game is safe to
+        close.
+
+        This is also where inputs are collected before they are sent to
+        the inputs for scene.
+
+        Finally, this is where FPS is set and where the display is updated.
+        """
+        # self.memory.screen = pygame.display.set_mode([width, height])
+        screen = pygame.display.set_mode([width, height])  # Set screen size
+        self.memory.screen = screen
+
+        pygame.scrap.init()
+        if not pygame.scrap.get_init():
+            raise Exception("pygame.scrap is no longer supported :(")
+
+        # Held keys send KEYDOWN again after 500ms, then every 20ms, and
+        # typed text comes in as TEXTINPUT with shift and layout applied
+        pygame.key.set_repeat(500, 20)
+        pygame.key.start_text_input()
+
+        # Put the resolution ratio into memory, where 1080 and 576 are the min
+
+        scene = current_scene  # Set scene currently shown through a parameter
+        shown_scene = scene
+        # Start game loop
+        while self.running:
+            keys_pressed = []  # Keys pressed/tapped (key press)
+            typed = ""  # Text typed, "\b" for each backspace
+            # Sleep until an event comes in when the scene isn't animating
+            idle_timeout = scene.idle_timeout()
+            if idle_timeout is None:
+                events = [pygame.event.wait()] + pygame.event.get()
+            elif 0 < idle_timeout:
+                events = [pygame.event.wait(idle_timeout)] + pygame.event.get()
+            else:
+                events = pygame.event.get()
+            if self.frame_timer is not None:
+                self.frame_timer.start()
+            keys_held = pygame.key.get_pressed()  # Keys held collected
+            for event in events:  # Collect all key presses
+                # Quit condition if you press the X on the top right
+                if event.type == pygame.QUIT:
+                    scene.save_map()
+                    self.running = False  # Stop running this loop
+                    pygame.mixer.music.stop()  # Stop the music
+                    scene.run_scene = False  # Tell scene to stop running
+                # If player does a keypress, append to our list for key presses
+                if event.type == pygame.KEYDOWN:
+                    keys_pressed.append(event.key)
+                    if event.key == pygame.K_BACKSPACE:
+                        typed += "\b"
+                elif event.type == pygame.TEXTINPUT:
+                    typed += event.text
+                elif event.type == pygame.MOUSEMOTION:
+                    keys_pressed.append(event.type)
+                elif event.type == pygame.MOUSEBUTTONDOWN or \
+                        event.type == pygame.MOUSEBUTTONUP:
+                    # The wheel also sends buttons 4 and 5, skip those
+                    if event.button not in [4, 5]:
+                        keys_pressed.append(event.type)
+                elif event.type == pygame.MOUSEWHEEL:
+                    # One press for every notch scrolled
+                    if 0 < event.y:
+                        keys_pressed += [WHEEL_UP] * event.y
+                    else:
+                        keys_pressed += [WHEEL_DOWN] * -event.y
+
+                """if event.type == self.memory.music.end:
+                    self.memory.music.switch_music()"""
+
+            # Stop the game using other conditions (running, but scene says off)
+            if self.running and not scene.run_scene:
+                scene.save_map()
+                self.running = False  # Stop running this loop
+                pygame.mixer.music.stop()  # Stop the music
+                scene.close_game()  # Tell scene to shut off
+            else:
+                # Functional game loop
+
+                scene.input(keys_pressed, keys_held, typed)  # Call to use keys in
+                if self.frame_timer is not None:
+                    self.frame_timer.lap("input")
+                scene.update()  # Call to dynamically use/update/check changes
+                if self.frame_timer is not None:
+                    self.frame_timer.lap("update")
+                rendered = scene.redraw_all or 0 < len(scene.dirty_rects)
+                if rendered:
+                    scene.render(screen)  # Visually render desired graphics
+                if self.frame_timer is not None:
+                    overlay_rect = self.frame_timer.render(screen, rendered)
+                    if overlay_rect is not None:
+                        scene.mark_dirty(overlay_rect)
+                    self.frame_timer.lap("render")
+                shown_scene = scene
+                scene = scene.this_scene
+                """This line is important to allow changing scenes (if 
+                this_scene is different like using 
+                scene.change_scene(next_scene). Otherwise, scene will not be 
+                changed and will continue being this scene (same memory
+                address, no change)."""
+
+                """if 0 != scene.level_id:
+                    self.memory.music.transition_music()"""
+
+            fps.tick(120)  # 120 frames per second
+            if self.frame_timer is not None:
+                self.frame_timer.skip()
+            # Update the visual output dynamically, only where it changed
+            if shown_scene.redraw_all:
+                pygame.display.update()
+            elif 0 < len(shown_scene.dirty_rects):
+                pygame.display.update(shown_scene.dirty_rects)
+            shown_scene.clear_dirty()
+            if self.frame_timer is not None and self.running:
+                self.frame_timer.lap("display")
+                self.frame_timer.end_frame()
+
+        if self.frame_timer is not None:
+            self.frame_timer.dump_csv(self.profile_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--import", dest="import_path",
+                        help="add a Python source tree to the map")
+    parser.add_argument("--map-format", choices=["pickle", "columns"],
+                        help="format to save the map in, by default the "
+                             "one it was saved in (columns needs numpy)")
+    args = parser.parse_args()
+
+    pygame.init()  # Initialize pygame
+    pygame.mixer.init()  # Initialize pygame's sound
+
+    fps = pygame.time.Clock()  # Initialize the frame rate
+
+    # Alter these values to change the resolution
+    game_width = 1280
+    game_height = 700
+    pygame.display.set_mode([game_width, game_height])
+
+    file_path = "put_icon_file_path_here"
+    """pygame.display.set_caption("display_window") # game window caption
+    icon = pygame.image.load(file_path + "file_image_name") # loading image
+    default_icon_image_size = (32, 32) # reducing size of image
+    icon = pygame.transform.scale(icon, default_icon_image_size) 
+    # scaling image correctly
+    pygame.display.set_icon(icon) # game window icon"""
+
+    start_game = Program(game_width, game_height, args.map_format)
+    # Initialize running the game with Program
+    start_scene = Map(start_game.memory)
+    # Initialize the first scene/starting scene shown to the player
+    if args.import_path is not None:
+        start_scene.import_code(args.import_path)
+    start_game.run(game_width, game_height, start_scene)  # Run the game loop
+    """The game loop will be stuck at this line (start_game.run) until the
+    while loop (while self.running:) is no longer true. When self.running is
+    False, the program will move onto the next line to quit"""
+
+    pygame.quit()  # Quit the game/pygame instance
@@ -0,0 +1,268 @@
+"""
+Headless benchmarks for the interactive code map (ICM.py).
+
+Builds a synthetic map of a configurable size and times the map engine
+without opening a window (SDL_VIDEODRIVER=dummy):
+    - Map.render_mode_0, on a cold static layer and while panning, at full
+      size and fully zoomed out, plus after an edit and on a new tile column
+    - Map.calculate_mouse on the points near the mouse, and mode_0 clicks
+    - Description.write_page/erase_write (split_text) on a full page
+    - MemoryPoint.pickle_dp/depickle_dp round-trip, and the same for the
+      columnar format when NumPy is installed
+
+Results are written as JSON so runs can be compared for regressions:
+    python ICM_benchmark.py --points 100000 --edge-density 1.5
+"""
+import os
+
+# Has to be set before pygame creates a window
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import json
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import pygame
+
+import ICM
+
+COLORS = [ICM.DARK_RED, ICM.DARK_GREEN, ICM.RED, ICM.LIME_GREEN, ICM.BLUE,
+          ICM.YELLOW, ICM.ORANGE, ICM.CYAN, ICM.PURPLE]
+WORDS = ["soup", "map", "point", "line", "code", "class", "function",
+         "module", "import", "call", "render", "update", "input", "save"]
+
+
+def make_text(rng, length):
+    text = ""
+    while len(text) < length:
+        text += rng.choice(WORDS) + " "
+    return text[:length]
+
+
+def build_map(memory, points, edge_density, desc_length, seed):
+    """Fill memory with random datapoints and lines, spread out so the
+    number of points per screen stays about the same at every size
+    """
+    rng = random.Random(seed)
+    spread = int((points ** 0.5) * 60) + 1
+    page_size = 12 * ICM.Description().char_per_line
+
+    for point_id in range(points):
+        new_point = ICM.DataPoint(12, True)
+        new_point.title.text = "point " + str(point_id)
+        new_point.change_icon_location(rng.randrange(spread),
+                                       rng.randrange(spread))
+        new_point.change_icon_color(rng.choice(COLORS))
+        new_point.change_id(point_id)
+        description = make_text(rng, desc_length)
+        new_point.description.pages = [description[page:page + page_size]
+                                       for page in range(0, len(description),
+                                                         page_size)] or [""]
+        memory.dp += [new_point]
+
+    for _ in range(int(points * edge_density)):
+        from_id = rng.randrange(points)
+        to_id = rng.randrange(points)
+        if from_id != to_id:
+            memory.edges.add(from_id, to_id, rng.choice(COLORS))
+
+
+def time_runs(action, runs):
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        action()
+        timings += [(time.perf_counter() - start) * 1000]
+    return timings
+
+
+def summarize(timings):
+    ordered = sorted(timings)
+    return {"runs": len(ordered),
+            "min_ms": ordered[0],
+            "median_ms": statistics.median(ordered),
+            "mean_ms": statistics.fmean(ordered),
+            "p95_ms": ordered[min(len(ordered) - 1,
+                                  int(len(ordered) * 0.95))],
+            "max_ms": ordered[-1]}
+
+
+def bench_render(scene, screen, runs):
+    results = {}
+
+    def cold_render():
+        scene.static_layer.clear()
+        scene.mark_dirty()
+        scene.render(screen)
+
+    def pan_render():
+        scene.x_offset -= 5
+        scene.mark_dirty()
+        scene.render(screen)
+
+    def new_column_render():
+        # A whole column of tiles comes into view at once
+        scene.x_offset -= scene.static_layer.tile_size
+        scene.mark_dirty()
+        scene.render(screen)
+
+    def edit_render():
+        # Only tiles under a point and its lines are drawn again
+        scene.invalidate_point(edited[len(edited) // 2])
+        scene.mark_dirty()
+        scene.render(screen)
+
+    results["render_mode_0_cold"] = summarize(time_runs(cold_render, runs))
+    results["render_mode_0_pan"] = summarize(time_runs(pan_render, runs))
+    edited = scene.visible_points(screen.get_rect())
+    results["render_mode_0_edit"] = summarize(time_runs(edit_render, runs))
+    results["render_mode_0_new_column"] = summarize(
+        time_runs(new_column_render, runs))
+
+    # Fully zoomed out, where points are drawn as clusters
+    scene.zoom_at(screen.get_width() // 2, screen.get_height() // 2,
+                  scene.min_zoom_level - scene.zoom_level)
+    results["render_zoomed_out_cold"] = summarize(time_runs(cold_render, runs))
+    results["render_zoomed_out_pan"] = summarize(time_runs(pan_render, runs))
+    scene.zoom_at(screen.get_width() // 2, screen.get_height() // 2,
+                  -scene.zoom_level)
+    return results
+
+
+def bench_hit_tests(scene, rng, runs):
+    results = {}
+    targets = [rng.choice(scene.datapoints) for _ in range(runs)]
+    target_iter = iter(targets * 2)
+
+    def aim_at(each_point):
+        scene.mouse.x = each_point.icon.center[0] + scene.x_offset
+        scene.mouse.y = each_point.icon.center[1] + scene.y_offset
+
+    def calculate_mouse():
+        aim_at(next(target_iter))
+        for each_point in scene.nearby_points():
+            scene.calculate_mouse(each_point)
+
+    def click():
+        aim_at(next(target_iter))
+        scene.mode_0()
+        # Leave nothing selected so every click does the same work
+        scene.select_point = None
+        scene.follow_mouse = False
+
+    results["calculate_mouse"] = summarize(time_runs(calculate_mouse, runs))
+    results["mode_0_click"] = summarize(time_runs(click, runs))
+    return results
+
+
+def bench_typing(runs):
+    description = ICM.Description()
+    page_size = 12 * description.char_per_line
+    description.pages = ["a" * (page_size - 1)]
+    description.split_text(0)
+    keystrokes = iter(range(runs * 2))
+
+    def keystroke():
+        # Alternate adding and erasing the last character of a full page
+        if next(keystrokes) % 2 == 0:
+            description.write_page(0, "b")
+        else:
+            description.erase_write(0)
+
+    return {"split_text_keystroke": summarize(time_runs(keystroke, runs))}
+
+
+def bench_pickle(scene, runs):
+    save_path = os.getcwd() + "/save"
+
+    def save():
+        new_save = ICM.MemoryPoint()
+        new_save.comp_dp(scene.datapoints, scene.edges)
+        new_save.pickle_dp(save_path)
+
+    def load():
+        ICM.MemoryPoint().depickle_dp("save")
+
+    def save_columns():
+        new_save = ICM.MemoryPoint()
+        new_save.comp_dp(scene.datapoints, scene.edges)
+        new_save.save_snapshot(save_path, "columns")
+
+    results = {"pickle_dp": summarize(time_runs(save, runs)),
+               "depickle_dp": summarize(time_runs(load, runs))}
+    if ICM.np is not None:
+        # Loading finds the columnar map once it replaced my_map
+        results["columns_save"] = summarize(time_runs(save_columns, runs))
+        results["columns_load"] = summarize(time_runs(load, runs))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--points", type=int, default=10000)
+    parser.add_argument("--edge-density", type=float, default=1.0,
+                        help="lines per point")
+    parser.add_argument("--desc-length", type=int, default=200,
+                        help="description characters per point")
+    parser.add_argument("--runs", type=int, default=50,
+                        help="timed runs per benchmark")
+    parser.add_argument("--save-runs", type=int, default=3,
+                        help="timed runs of the pickle round-trip")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default="ICM_benchmark.json")
+    args = parser.parse_args()
+    output_path = os.path.abspath(args.output)
+
+    # ICM loads its images and save folder relative to the working folder
+    image_path = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                              "images")
+    work_path = tempfile.mkdtemp(prefix="icm_benchmark_")
+    shutil.copytree(image_path, os.path.join(work_path, "assets", "images"))
+    os.mkdir(os.path.join(work_path, "save"))
+    os.chdir(work_path)
+
+    try:
+        pygame.init()
+        screen = pygame.display.set_mode([1280, 700])
+
+        memory = ICM.Memory(1280, 700)
+        build_start = time.perf_counter()
+        build_map(memory, args.points, args.edge_density, args.desc_length,
+                  args.seed)
+        scene = ICM.Map(memory)
+        build_ms = (time.perf_counter() - build_start) * 1000
+
+        results = {"build_map": summarize([build_ms])}
+        results.update(bench_render(scene, screen, args.runs))
+        results.update(bench_hit_tests(scene, random.Random(args.seed),
+                                       args.runs))
+        results.update(bench_typing(args.runs))
+        results.update(bench_pickle(scene, args.save_runs))
+        pygame.quit()
+    finally:
+        os.chdir(os.path.dirname(output_path))
+        shutil.rmtree(work_path, ignore_errors=True)
+
+    report = {"config": vars(args),
+              "python": platform.python_version(),
+              "pygame": pygame.version.ver,
+              "platform": platform.platform(),
+              "results": results}
+    with open(output_path, "w") as out_file:
+        json.dump(report, out_file, indent=2)
+
+    for name, stats in results.items():
+        print(name.ljust(24), "median %.3f ms" % stats["median_ms"],
+              " p95 %.3f ms" % stats["p95_ms"])
+    print("Results written to", output_path)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
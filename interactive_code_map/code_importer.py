@@ -0,0 +1,397 @@
+"""
+Builds the points and lines of an interactive code map from a Python
+source tree.
+
+Files are parsed with ast in a pool of processes, one symbol for every
+module, class and function. Lines are made for:
+    - what a module or class contains
+    - imports between modules in the tree
+    - calls between functions that can be told apart by name
+
+Only the standard library is used here. The process pool is run by this
+file started as a script of its own, so its workers never import the
+caller's script, pygame or ICM, or share the caller's pygame window.
+"""
+import ast
+import gc
+import hashlib
+import os
+import pickle
+import subprocess
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+# Folders that never hold the tree's own code
+SKIP_DIRS = {"__pycache__", "build", "dist", "node_modules", "site-packages",
+             "venv", "env"}
+
+
+def find_sources(source_path):
+    """Return the path of every .py file under source_path"""
+    file_paths = []
+    for dir_path, dir_names, file_names in os.walk(source_path):
+        dir_names[:] = sorted(dir_name for dir_name in dir_names
+                              if not dir_name.startswith(".") and
+                              dir_name not in SKIP_DIRS)
+        for file_name in sorted(file_names):
+            if file_name.endswith(".py"):
+                file_paths += [os.path.join(dir_path, file_name)]
+    return file_paths
+
+
+def module_name(source_path, file_path):
+    # "pkg/sub/mod.py" -> "pkg.sub.mod", "pkg/__init__.py" -> "pkg"
+    parts = os.path.relpath(file_path, source_path)[:-len(".py")].split(
+        os.sep)
+    if parts[-1] == "__init__" and 1 < len(parts):
+        parts = parts[:-1]
+    return ".".join(parts)
+
+
+class SymbolVisitor(ast.NodeVisitor):
+    """
+    Class used to collect a module's classes, functions, imports and the
+    names each function calls
+    """
+
+    def __init__(self, module, is_package):
+        self.module = module
+        self.is_package = is_package
+        self.scope = []     # Qualified names of the classes/functions we're in
+        self.symbols = []   # (qualname, kind, line, docstring)
+        self.imports = set()    # Dotted names of imported modules
+        self.calls = set()  # (caller qualname, called name, called on self)
+
+    def add_symbol(self, node, kind):
+        qualname = ".".join(self.scope + [node.name])
+        self.symbols += [(qualname, kind, node.lineno,
+                          ast.get_docstring(node) or "")]
+        self.scope += [node.name]
+        self.generic_visit(node)
+        self.scope.pop()
+
+    def visit_ClassDef(self, node):
+        self.add_symbol(node, "class")
+
+    def visit_FunctionDef(self, node):
+        self.add_symbol(node, "function")
+
+    def visit_AsyncFunctionDef(self, node):
+        self.add_symbol(node, "function")
+
+    def visit_Import(self, node):
+        for alias in node.names:
+            self.imports.add(alias.name)
+
+    def visit_ImportFrom(self, node):
+        base = node.module or ""
+        if 0 < node.level:
+            # Relative imports start from this module's package
+            package = self.module.split(".")
+            if not self.is_package:
+                package = package[:-1]
+            if 1 < node.level:
+                package = package[:1 - node.level]
+            base = ".".join(package + ([base] if base else []))
+        if base:
+            self.imports.add(base)
+        for alias in node.names:
+            # from pkg import mod imports a module too
+            self.imports.add(base + "." + alias.name if base else alias.name)
+
+    def visit_Call(self, node):
+        caller = ".".join(self.scope)
+        if isinstance(node.func, ast.Name):
+            self.calls.add((caller, node.func.id, False))
+        elif isinstance(node.func, ast.Attribute):
+            on_self = isinstance(node.func.value, ast.Name) and \
+                node.func.value.id in ["self", "cls"]
+            self.calls.add((caller, node.func.attr, on_self))
+        self.generic_visit(node)
+
+
+def parse_file(file_path, module):
+    """Parse one file, runs inside a worker process. Returns a dict of
+    plain data so it's cheap to send back
+    """
+    try:
+        with open(file_path, "rb") as in_file:
+            tree = ast.parse(in_file.read(), file_path)
+    except (SyntaxError, ValueError, OSError):
+        # Files we can't read or parse still get a point
+        tree = ast.Module(body=[], type_ignores=[])
+
+    visitor = SymbolVisitor(module, file_path.endswith("__init__.py"))
+    visitor.visit(tree)
+    return {"path": file_path,
+            "module": module,
+            "doc": ast.get_docstring(tree) or "",
+            "symbols": visitor.symbols,
+            "imports": sorted(visitor.imports),
+            "calls": sorted(visitor.calls)}
+
+
+def parse_files(source_path, file_paths, workers=None):
+    """Parse file_paths with a process pool, in the same order"""
+    modules = [module_name(source_path, file_path) for file_path in file_paths]
+    if len(file_paths) < 32 or workers == 1:
+        # Starting processes costs more than parsing a few files
+        return [parse_file(file_path, module)
+                for file_path, module in zip(file_paths, modules)]
+
+    # Spawned workers import the caller's main script again, so the pool
+    # runs in a process started from this file instead (see the bottom)
+    parsed = subprocess.run([sys.executable, os.path.abspath(__file__)],
+                            input=pickle.dumps((file_paths, modules, workers)),
+                            stdout=subprocess.PIPE, check=True)
+    return pickle.loads(parsed.stdout)
+
+
+def run_pool(file_paths, modules, workers=None):
+    # Runs in the process parse_files starts, whose main script is this file
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(
+            parse_file, file_paths, modules,
+            chunksize=max(1, len(file_paths) // ((workers or
+                                                  os.cpu_count() or 1) * 8))))
+
+
+class ImportCache:
+    """
+    Class used to keep what was parsed from a source tree between imports,
+    so only files whose content changed are parsed and linked again.
+
+    Symbols are dicts with key, kind, title, path, line and doc. Links are
+    (from key, to key, kind) with kind "contains", "imports" or "calls".
+    Keys are "module" or "module:qualname", stable across imports.
+    """
+
+    def __init__(self, source_path):
+        self.source_path = os.path.abspath(source_path)
+        # Modules of a package are named from the folder holding it
+        self.name_path = self.source_path
+        if os.path.isfile(os.path.join(self.source_path, "__init__.py")):
+            self.name_path = os.path.dirname(self.source_path)
+        self.files = {}     # File path -> what was parsed and linked from it
+        self.modules = {}   # Module -> file path
+        self.by_name = {}   # Function name -> keys of functions with that name
+        self.by_module = {}     # (module, function name) -> keys
+        self.callers = {}   # Called name -> paths of files calling it
+        self.key_ids = {}   # Symbol key -> id of its point on the map
+        self.unsaved = False    # Changed since it was last saved
+
+    def refresh(self, workers=None):
+        """Parse new and changed files and forget deleted ones.
+
+        Returns the symbols of every file that was parsed, the keys of
+        symbols that are gone, and the links that were added and removed
+        """
+        changed = []    # (path, (mtime, size), content hash)
+        file_paths = find_sources(self.source_path)
+        for file_path in file_paths:
+            file_stat = os.stat(file_path)
+            stamp = (file_stat.st_mtime_ns, file_stat.st_size)
+            entry = self.files.get(file_path)
+            if entry is not None and entry["stamp"] == stamp:
+                continue
+            with open(file_path, "rb") as in_file:
+                digest = hashlib.sha1(in_file.read()).hexdigest()
+            self.unsaved = True
+            if entry is not None and entry["hash"] == digest:
+                # Touched but not edited
+                entry["stamp"] = stamp
+                continue
+            changed += [(file_path, stamp, digest)]
+
+        seen = set(file_paths)
+        removed = [file_path for file_path in self.files
+                   if file_path not in seen]
+        if 0 < len(removed):
+            self.unsaved = True
+        new_modules = any(file_path not in self.files
+                          for file_path, _, _ in changed)
+        parsed_files = parse_files(self.name_path,
+                                   [file_path for file_path, _, _ in changed],
+                                   workers)
+
+        old_keys = set()
+        old_functions = set()
+        old_links = set()
+        for file_path in removed + [file_path for file_path, _, _ in changed
+                                    if file_path in self.files]:
+            entry = self.forget(file_path)
+            old_keys.update(symbol["key"] for symbol in entry["symbols"])
+            old_functions.update(entry["functions"])
+            old_links.update(self.file_links(entry))
+
+        symbols = []
+        new_functions = set()
+        for (file_path, stamp, digest), parsed in zip(changed, parsed_files):
+            entry = self.learn(file_path, stamp, digest, parsed)
+            symbols += entry["symbols"]
+            new_functions.update(entry["functions"])
+        new_keys = {symbol["key"] for symbol in symbols}
+
+        # Calls to a name only resolve differently once functions with
+        # that name come or go, edited bodies keep their keys
+        changed_names = {key.rpartition(".")[2].rpartition(":")[2]
+                         for key in old_functions ^ new_functions}
+        relink_all = new_modules or 0 < len(removed)
+        changed_paths = set(file_path for file_path, _, _ in changed)
+        relink_paths = set(changed_paths)
+        if relink_all:
+            relink_paths = set(self.files)
+        new_links = set()
+        for file_path in relink_paths:
+            entry = self.files[file_path]
+            if file_path not in changed_paths:
+                old_links.update(self.file_links(entry))
+            self.link_imports(entry)
+            self.link_calls(entry, entry["called"])
+            new_links.update(self.file_links(entry))
+        if not relink_all:
+            for name in changed_names:
+                for file_path in self.callers.get(name, set()) - relink_paths:
+                    entry = self.files[file_path]
+                    old_links.update(entry["calls"].get(name, set()))
+                    self.link_calls(entry, [name])
+                    new_links.update(entry["calls"].get(name, set()))
+        return (symbols, old_keys - new_keys, new_links - old_links,
+                old_links - new_links)
+
+    def learn(self, file_path, stamp, digest, parsed):
+        # Add a parsed file's symbols to the indexes, links come later
+        module = parsed["module"]
+        rel_path = os.path.relpath(file_path, self.name_path)
+        entry = {"stamp": stamp, "hash": digest, "module": module,
+                 "imported": parsed["imports"],
+                 "symbols": [{"key": module, "kind": "module",
+                              "title": module, "path": rel_path, "line": 1,
+                              "doc": parsed["doc"]}],
+                 "functions": set(),
+                 "contains": set(),
+                 "called": {},  # Called name -> [(caller, on self)]
+                 "imports": set(),
+                 "calls": {}}   # Called name -> call links
+        for qualname, kind, line, doc in parsed["symbols"]:
+            key = module + ":" + qualname
+            entry["symbols"] += [{"key": key, "kind": kind, "title": qualname,
+                                  "path": rel_path, "line": line, "doc": doc}]
+            parent = qualname.rpartition(".")[0]
+            entry["contains"].add((module + ":" + parent if parent else module,
+                                   key, "contains"))
+            if kind == "function":
+                name = qualname.rpartition(".")[2]
+                entry["functions"].add(key)
+                self.by_name.setdefault(name, set()).add(key)
+                self.by_module.setdefault((module, name), set()).add(key)
+        for caller, name, on_self in parsed["calls"]:
+            if caller:
+                entry["called"].setdefault(name, []).append((caller, on_self))
+                self.callers.setdefault(name, set()).add(file_path)
+
+        self.files[file_path] = entry
+        self.modules[module] = file_path
+        return entry
+
+    def forget(self, file_path):
+        # Take a file's symbols out of the indexes
+        entry = self.files.pop(file_path)
+        module = entry["module"]
+        for key in entry["functions"]:
+            name = key.rpartition(".")[2].rpartition(":")[2]
+            self.by_name[name].discard(key)
+            self.by_module[(module, name)].discard(key)
+        for name in entry["called"]:
+            self.callers[name].discard(file_path)
+        if self.modules.get(module) == file_path:
+            del self.modules[module]
+        return entry
+
+    @staticmethod
+    def file_links(entry):
+        links = entry["contains"] | entry["imports"]
+        for call_links in entry["calls"].values():
+            links |= call_links
+        return links
+
+    def link_imports(self, entry):
+        entry["imports"] = set()
+        for imported in entry["imported"]:
+            # from pkg.mod import name is kept as pkg.mod
+            while imported and imported not in self.modules:
+                imported = imported.rpartition(".")[0]
+            if imported and imported != entry["module"]:
+                entry["imports"].add((entry["module"], imported, "imports"))
+
+    def link_calls(self, entry, names):
+        module = entry["module"]
+        imported = [link[1] for link in entry["imports"]]
+        for name in names:
+            call_links = set()
+            called_keys = self.by_name.get(name, set())
+            for caller, on_self in entry["called"].get(name, []):
+                if len(called_keys) < 1:
+                    break
+                caller_key = module + ":" + caller
+                if on_self:
+                    # self.name() calls a method of the caller's own class
+                    called_key = caller_key.rpartition(".")[0] + "." + name
+                    found = [called_key] if called_key in called_keys else []
+                elif 1 < len(called_keys):
+                    # Otherwise prefer this module, then what it imports
+                    found = list(self.by_module.get((module, name), ()))
+                    if len(found) < 1:
+                        found = [key for each_module in imported
+                                 for key in self.by_module.get(
+                                     (each_module, name), ())]
+                else:
+                    found = list(called_keys)
+                # Names that could mean more than one function are left out
+                if len(found) == 1 and found[0] != caller_key:
+                    call_links.add((caller_key, found[0], "calls"))
+            if call_links:
+                entry["calls"][name] = call_links
+            else:
+                entry["calls"].pop(name, None)
+
+    def save(self, cache_path):
+        # Nothing here can be freed by the garbage collector, so it's kept
+        # from walking the cache over and over while it's written and read
+        gc.disable()
+        try:
+            # Written beside the old cache first so a crash never leaves
+            # half a cache
+            with open(cache_path + ".tmp", "wb") as out_file:
+                pickle.dump(self, out_file, pickle.HIGHEST_PROTOCOL)
+                out_file.flush()
+                os.fsync(out_file.fileno())
+        finally:
+            gc.enable()
+        os.replace(cache_path + ".tmp", cache_path)
+        self.unsaved = False
+
+    @staticmethod
+    def load(cache_path):
+        gc.disable()
+        try:
+            with open(cache_path, "rb") as in_file:
+                return pickle.load(in_file)
+        finally:
+            gc.enable()
+
+
+def import_tree(source_path, workers=None):
+    """Parse every Python file under source_path and return its symbols
+    and sorted links
+    """
+    symbols, _, links, _ = ImportCache(source_path).refresh(workers)
+    return symbols, sorted(links)
+
+
+if __name__ == "__main__":
+    # Started by parse_files: what to parse comes in on stdin, what was
+    # parsed goes back on stdout
+    pool_args = pickle.load(sys.stdin.buffer)
+    pickle.dump(run_pool(*pool_args), sys.stdout.buffer,
+                pickle.HIGHEST_PROTOCOL)